@@ -1,15 +1,29 @@
 import os
 import json
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file
 from dotenv import load_dotenv
-from extractor import extract_by_paragraphs
+from extractor import Config, clean_text, extract_batch, get_hedge_stats, get_scheduler_stats
 from utils.excel_export import export_vocab_to_excel
+from utils.corpus_index import CorpusIndex, MAX_QUERY_LIMIT
+from utils.llm_scheduler import QuotaExceeded, INTERACTIVE, BATCH
+from utils.http_cache import compress_response, content_etag
 
 # 加载环境变量
 load_dotenv()
 
 app = Flask(__name__)
 
+# 紧凑JSON输出（调试模式下默认会缩进美化）
+app.json.compact = True
+
+# 语料词汇索引（持久化到磁盘，跨文章累积提取结果）
+corpus_index = CorpusIndex(os.getenv('CORPUS_INDEX_PATH', 'data/corpus_index.db'))
+
+@app.after_request
+def compress(response):
+    """按 Accept-Encoding 压缩JSON/CSV响应"""
+    return compress_response(response, request.accept_encodings)
+
 @app.route('/')
 def index():
     """渲染主页面"""
@@ -23,19 +37,56 @@ def extract_words():
         data = request.get_json()
         article = data.get('article', '')
         difficulty = data.get('difficulty', 'medium')
+        # 批量/后台任务传 priority=batch，只使用交互请求剩余的上游容量
+        priority = BATCH if data.get('priority') == BATCH else INTERACTIVE
+        # 配额按客户端IP计算（X-User-Id 等请求头可被伪造，不用于配额）
+        client_id = request.remote_addr
         
         if not article:
             return jsonify({'error': '文章内容不能为空！'}), 400
         
+        # 由文章内容、难度、模型和分段配置生成ETag，客户端已有相同结果时直接返回304，不再调用上游
+        etag = content_etag(
+            clean_text(article), difficulty, Config.MODEL,
+            Config.WORDS_PER_SEGMENT, Config.MIN_SEGMENT_WORDS
+        )
+        # "*" 匹配任何已存在的资源，对按内容生成结果的 POST 没有意义，忽略
+        if not request.if_none_match.star_tag and request.if_none_match.contains_weak(etag):
+            not_modified = Response(status=304)
+            not_modified.set_etag(etag, weak=True)
+            return not_modified
+        
         # 调用词汇提取函数
-        vocab_list = extract_by_paragraphs(article, difficulty)
+        batch = extract_batch(article, difficulty, priority, client_id)
+        vocab_list = batch.to_dicts()
         
-        return jsonify({
+        # 统计离线降级提取的词汇项
+        degraded_count = sum(1 for item in vocab_list if item.get('degraded'))
+        
+        # 写入语料索引：有段落降级或失败时不入索引，以免占用该文章的索引记录
+        # （同一文章同一难度只会写入一次，之后的完整结果将无法再入索引）
+        if batch.complete:
+            corpus_index.add_article(article, difficulty, vocab_list, title=data.get('title'))
+        
+        response = jsonify({
             'success': True,
             'vocabulary': vocab_list,
-            'count': len(vocab_list)
+            'count': len(vocab_list),
+            'degraded': degraded_count > 0,
+            'degraded_count': degraded_count,
+            'incomplete_segments': batch.incomplete_segments
         })
         
+        # 只有所有段落都得到完整LLM结果时才带ETag：降级或失败（空结果）的响应若被客户端缓存，
+        # 之后的请求会一直得到304，上游恢复后重新提交也无法获得完整结果
+        # 使用弱ETag：gzip/br 压缩后的响应与原始内容语义相同
+        if batch.complete:
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+        
+    except QuotaExceeded as e:
+        return jsonify({'error': f'请求超出配额: {str(e)}'}), 429
     except Exception as e:
         return jsonify({'error': f'提取失败: {str(e)}'}), 500
 
@@ -66,6 +117,66 @@ def export_excel():
     except Exception as e:
         return jsonify({'error': f'导出失败: {str(e)}'}), 500
 
+@app.route('/corpus/search')
+def corpus_search():
+    """查询包含某个单词/词组的文章"""
+    term = request.args.get('q', '').strip()
+    if not term:
+        return jsonify({'error': '查询词不能为空！'}), 400
+    
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_QUERY_LIMIT)
+    return jsonify(corpus_index.find_articles(term, limit))
+
+@app.route('/corpus/top')
+def corpus_top():
+    """获取语料中最常见的词汇"""
+    # n<=0 在索引中表示不限条数，接口需限制范围，完整导出请使用 /corpus/export
+    n = min(max(request.args.get('n', 50, type=int), 1), MAX_QUERY_LIMIT)
+    difficulty = request.args.get('difficulty') or None
+    item_type = request.args.get('type') or None
+    
+    terms = corpus_index.top_terms(n, difficulty, item_type)
+    return jsonify({
+        'success': True,
+        'vocabulary': terms,
+        'count': len(terms)
+    })
+
+@app.route('/corpus/export', methods=['POST'])
+def corpus_export():
+    """导出语料聚合词汇表为Excel"""
+    try:
+        data = request.get_json(silent=True) or {}
+        vocab_list = corpus_index.export_terms(data.get('difficulty') or None)
+        
+        if not vocab_list:
+            return jsonify({'error': '语料索引中没有词汇数据'}), 400
+        
+        # 保留聚合表特有的类型、频次和文章数列
+        filepath = export_vocab_to_excel(vocab_list, extra_columns=['type', 'freq', 'articles'])
+        
+        if not filepath:
+            return jsonify({'error': 'Excel文件生成失败'}), 500
+        
+        filename = os.path.basename(filepath)
+        
+        return jsonify({
+            'success': True,
+            'download_url': f'/download/{filename}'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'导出失败: {str(e)}'}), 500
+
+@app.route('/stats')
+def stats():
+    """返回上游请求统计（对冲次数、浪费等）"""
+    return jsonify({
+        'hedge': get_hedge_stats(),
+        'scheduler': get_scheduler_stats(),
+        'corpus': corpus_index.stats()
+    })
+
 @app.route('/download/<filename>')
 def download_file(filename):
     """提供文件下载"""
@@ -4,11 +4,23 @@ import re
 import hashlib
 import datetime
 import logging
+import time
+import queue
+import atexit
+import itertools
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from functools import lru_cache
 from typing import List
 from dotenv import load_dotenv
 from openai import OpenAI
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from utils.offline_extractor import extract_offline
+from utils.pos import POS_MAPPING, normalize_pos
+from utils.vocab_items import VocabItem, VocabBatch
+from utils.llm_scheduler import LLMScheduler, SchedulerTimeout, SchedulerCancelled, INTERACTIVE, parse_weights
 
 # ====================== 配置和常量 ======================
 # 最先加载环境变量
@@ -19,6 +31,8 @@ load_dotenv()
 class Config:
     MODEL = os.getenv("MODEL", "gpt-3.5-turbo")
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.1))
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", 2500))
     TEMPERATURE = float(os.getenv("TEMPERATURE", 0.7))
     API_KEY = os.getenv("OPENAI_API_KEY")
@@ -27,69 +41,97 @@ class Config:
     CACHE_SIZE = int(os.getenv("CACHE_SIZE", 100))
     WORDS_PER_SEGMENT = int(os.getenv("WORDS_PER_SEGMENT", 200))
     MIN_SEGMENT_WORDS = int(os.getenv("MIN_SEGMENT_WORDS", 50))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 0))
+    LATENCY_BUDGET = float(os.getenv("LATENCY_BUDGET", 120))
+    OFFLINE_FALLBACK = os.getenv("OFFLINE_FALLBACK", "true").lower() == "true"
+    LOCAL_LEXICON_PATH = os.getenv("LOCAL_LEXICON_PATH", "data/lexicon.json")
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 95))
+    HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", 10))
+    HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+    HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", 200))
+    HEDGE_WORKERS = int(os.getenv("HEDGE_WORKERS", 8))
+    HEDGE_MODEL = os.getenv("HEDGE_MODEL") or MODEL
+    HEDGE_BASE_URL = os.getenv("HEDGE_BASE_URL") or BASE_URL
+    HEDGE_API_KEY = os.getenv("HEDGE_API_KEY") or API_KEY
+    SCHED_MAX_CONCURRENT = int(os.getenv("SCHED_MAX_CONCURRENT", 4))
+    SCHED_RPM = float(os.getenv("SCHED_RPM", 0))
+    SCHED_WEIGHTS = os.getenv("SCHED_WEIGHTS", "interactive:4,batch:1")
+    SCHED_QUEUE_TIMEOUT = float(os.getenv("SCHED_QUEUE_TIMEOUT", 30))
+    SCHED_CLIENT_MAX_PENDING = int(os.getenv("SCHED_CLIENT_MAX_PENDING", 20))
+    SCHED_CLIENT_RPM = int(os.getenv("SCHED_CLIENT_RPM", 60))
+    SCHED_INTERACTIVE_RESERVE = int(os.getenv("SCHED_INTERACTIVE_RESERVE", 1))
+
+
+class UpstreamError(Exception):
+    """LLM上游调用失败（超时、限流、无效响应等）"""
 
 
-# 词性映射表
-POS_MAPPING = {
-    # 名词
-    "n": ".n",
-    "noun": ".n",
-    "substantive": ".n",
-    ".n": ".n",
-    # 动词
-    "v": ".v",
-    "verb": ".v",
-    "vb": ".v",
-    ".v": ".v",
-    # 形容词
-    "adj": ".adj",
-    "adjective": ".adj",
-    "a": ".adj",
-    ".adj": ".adj",
-    # 副词
-    "adv": ".adv",
-    "adverb": ".adv",
-    "ad": ".adv",
-    ".adv": ".adv",
-    # 介词
-    "prep": ".prep",
-    "preposition": ".prep",
-    "pr": ".prep",
-    ".prep": ".prep",
-    # 连词
-    "conj": ".conj",
-    "conjunction": ".conj",
-    "cj": ".conj",
-    ".conj": ".conj",
-    # 代词
-    "pron": ".pron",
-    "pronoun": ".pron",
-    "pn": ".pron",
-    ".pron": ".pron",
-    # 限定词
-    "det": ".det",
-    "determiner": ".det",
-    "dt": ".det",
-    ".det": ".det",
-    # 数词
-    "num": ".num",
-    "numeral": ".num",
-    "number": ".num",
-    ".num": ".num",
-    # 感叹词
-    "intj": ".intj",
-    "interjection": ".intj",
-    "interj": ".intj",
-    ".intj": ".intj",
-    # 默认名词
-    "": ".n",
-    None: ".n",
-}
+# ====================== 日志系统 ======================
+class JsonFormatter(logging.Formatter):
+    """结构化JSON日志格式"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}",
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class SampleFilter(logging.Filter):
+    """
+    对标记为 sampled 的逐段调试日志按比例采样
+    在入队前过滤，被丢弃的记录不产生任何格式化和I/O开销
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.rate >= 1:
+            return True
+        if self.rate <= 0:
+            return False
+        # 确定性采样：每 1/rate 条保留一条
+        return next(self._counter) % round(1 / self.rate) == 0
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    将原始日志记录放入队列，消息格式化推迟到后台监听线程
+    （默认的 QueueHandler.prepare 会在调用线程中格式化消息）
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# 逐段日志的采样标记
+SAMPLED = {"sampled": True}
 
 
-# ====================== 日志系统 ======================
 def setup_logging():
-    """配置日志系统"""
+    """
+    配置日志系统
+    根日志器只挂载一个队列处理器，文件和控制台I/O由后台监听线程完成；
+    重复导入本模块时不会重复添加处理器
+    """
+    root = logging.getLogger()
+    root.setLevel(Config.LOG_LEVEL)
+    # 按标记而非类型判断，模块被重新导入后类对象不同也能识别
+    if any(getattr(h, "_vocab_queue", False) for h in root.handlers):
+        return root
+
     # 创建日志目录
     os.makedirs(Config.LOG_DIR, exist_ok=True)
 
@@ -98,8 +140,11 @@ def setup_logging():
     log_file = f"{Config.LOG_DIR}/vocabulary_extractor_{current_date}.log"
 
     # 设置日志格式
-    log_format = "%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s"
-    formatter = logging.Formatter(log_format)
+    if Config.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        log_format = "%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s"
+        formatter = logging.Formatter(log_format)
 
     # 配置文件处理器
     file_handler = RotatingFileHandler(
@@ -113,19 +158,24 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
 
-    # 获取根日志器并配置
-    logger = logging.getLogger()
-    logger.setLevel(Config.LOG_LEVEL)
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # 请求线程只负责入队，格式化和写入由后台监听线程完成
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler._vocab_queue = True
+    queue_handler.addFilter(SampleFilter(Config.LOG_SAMPLE_RATE))
 
-    return logger
+    listener = QueueListener(log_queue, file_handler, console_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root.addHandler(queue_handler)
+    return root
 
 
 # 初始化日志
 logger = setup_logging()
 logger.info("Application started")
-logger.info(f"Configuration: MODEL={Config.MODEL}, LOG_LEVEL={Config.LOG_LEVEL}")
+logger.info("Configuration: MODEL=%s, LOG_LEVEL=%s", Config.MODEL, Config.LOG_LEVEL)
 
 
 # ====================== 文本处理工具 ======================
@@ -210,22 +260,6 @@ def split_by_word_count(
     return merged_segments
 
 
-def normalize_pos(pos: str) -> str:
-    """规范化词性标签"""
-    if not pos:
-        return ".n"
-
-    # 清理和标准化输入
-    pos = pos.lower().strip().replace(" ", "")
-
-    # 检查是否已经是标准格式
-    if pos in POS_MAPPING.values():
-        return pos
-
-    # 映射到标准格式
-    return POS_MAPPING.get(pos, ".n")
-
-
 # ====================== 核心词汇提取功能 ======================
 def build_system_prompt(difficulty: str) -> str:
     """构造系统提示词"""
@@ -304,19 +338,22 @@ def build_system_prompt(difficulty: str) -> str:
     """
 
 
-def parse_vocabulary_response(response: str) -> List[dict]:
-    """解析API响应为词汇列表"""
+def parse_vocabulary_response(response) -> List[VocabItem]:
+    """
+    解析API响应为词汇列表（VocabItem，可通过 to_dict() 转为JSON结构）
+    response 可以是JSON字符串，也可以是已解析的字典
+    """
     try:
         # 尝试解析JSON
-        data = json.loads(response)
+        data = json.loads(response) if isinstance(response, str) else response
 
         # 验证数据结构
         if not isinstance(data, dict) or "vocabulary" not in data:
-            logger.warning(f"响应缺少 'vocabulary' 字段")
+            logger.warning("响应缺少 'vocabulary' 字段")
             return []
 
         vocab_list = data["vocabulary"]
-        logger.debug(f"原始解析到 {len(vocab_list)} 个词汇项")
+        logger.debug("原始解析到 %d 个词汇项", len(vocab_list), extra=SAMPLED)
 
         # 验证每个词汇项
         valid_vocab = []
@@ -325,122 +362,447 @@ def parse_vocabulary_response(response: str) -> List[dict]:
             required_keys = ["word", "pos", "definition"]
             if not all(key in item for key in required_keys):
                 missing = [key for key in required_keys if key not in item]
-                logger.warning(f"词汇项缺少字段 {missing}: {item.get('word', '未知')}")
+                logger.warning("词汇项缺少字段 %s: %s", missing, item.get("word", "未知"))
                 continue
 
-            # 规范化词性标签
-            item["pos"] = normalize_pos(item["pos"])
-
-            # 确保可选字段存在
-            item.setdefault("definition-ch", "")
-            item.setdefault("common-usage", [])
-            item.setdefault("type", "word")
-
             # 确保 common-usage 是列表
-            if not isinstance(item["common-usage"], list):
-                if isinstance(item["common-usage"], str):
-                    item["common-usage"] = [item["common-usage"]]
-                else:
-                    item["common-usage"] = []
+            common_usage = item.get("common-usage", [])
+            if not isinstance(common_usage, list):
+                common_usage = [common_usage] if isinstance(common_usage, str) else []
 
             # 截断过长的释义
-            if len(item["definition"]) > 100:
-                item["definition"] = item["definition"][:97] + "..."
+            definition = item["definition"]
+            if len(definition) > 100:
+                definition = definition[:97] + "..."
 
             # 验证类型字段
-            if item["type"] not in ["word", "phrase"]:
-                item["type"] = "word"
-
-            valid_vocab.append(item)
-
-        logger.info(f"验证后保留 {len(valid_vocab)} 个有效词汇项")
+            item_type = item.get("type", "word")
+            if item_type not in ["word", "phrase"]:
+                item_type = "word"
+
+            valid_vocab.append(
+                VocabItem(
+                    word=item["word"],
+                    pos=normalize_pos(item["pos"]),  # 规范化词性标签
+                    definition=definition,
+                    definition_ch=item.get("definition-ch", ""),
+                    common_usage=common_usage,
+                    type=item_type,
+                )
+            )
+
+        logger.debug("验证后保留 %d 个有效词汇项", len(valid_vocab), extra=SAMPLED)
         return valid_vocab
 
     except json.JSONDecodeError as e:
-        logger.error(f"JSON解析失败: {e.msg}")
-        logger.debug(f"错误位置: {e.lineno}:{e.colno}, 原始响应: {response[:200]}...")
+        logger.error("JSON解析失败: %s", e.msg)
+        logger.debug("错误位置: %d:%d, 原始响应: %s...", e.lineno, e.colno, response[:200])
         return []
     except Exception as e:
-        logger.error(f"解析响应时出错: {str(e)}", exc_info=True)
+        logger.error("解析响应时出错: %s", e, exc_info=True)
         return []
 
 
 # 初始化OpenAI客户端（放在依赖函数之后）
-client = OpenAI(api_key=Config.API_KEY, base_url=Config.BASE_URL)
-
+# 显式设置重试次数：SDK默认重试2次，每次都会用满超时时间
+client = OpenAI(api_key=Config.API_KEY, base_url=Config.BASE_URL, max_retries=Config.LLM_MAX_RETRIES)
 
-@lru_cache(maxsize=Config.CACHE_SIZE)
-def extract_vocabulary(article: str, difficulty: str = "medium") -> List[dict]:
+# 对冲请求使用的备用客户端（未配置备用端点时复用主客户端）
+if Config.HEDGE_BASE_URL != Config.BASE_URL or Config.HEDGE_API_KEY != Config.API_KEY:
+    hedge_client = OpenAI(
+        api_key=Config.HEDGE_API_KEY, base_url=Config.HEDGE_BASE_URL, max_retries=Config.LLM_MAX_RETRIES
+    )
+else:
+    hedge_client = client
+
+
+# ====================== 请求调度 ======================
+# 进程级调度器：所有上游请求（包括对冲请求）都需先获取槽位
+scheduler = LLMScheduler(
+    max_concurrent=Config.SCHED_MAX_CONCURRENT,
+    rate_per_minute=Config.SCHED_RPM,
+    weights=parse_weights(Config.SCHED_WEIGHTS),
+    client_max_pending=Config.SCHED_CLIENT_MAX_PENDING,
+    client_rate_per_minute=Config.SCHED_CLIENT_RPM,
+    interactive_reserve=Config.SCHED_INTERACTIVE_RESERVE,
+)
+
+# 当前请求的优先级通道，由 extract_batch 设置
+# extract_vocabulary 按内容缓存，因此调度信息不作为其参数传递
+request_lane = contextvars.ContextVar("request_lane", default=INTERACTIVE)
+
+# 当前请求的延迟预算截止时间（time.monotonic()），由 extract_batch 设置，未设置时不限制
+request_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+def remaining_budget() -> float:
+    """当前请求剩余的延迟预算（秒），未设置预算时返回None"""
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def get_scheduler_stats() -> dict:
+    """获取调度器统计"""
+    return scheduler.snapshot()
+
+
+# ====================== 对冲请求 ======================
+class HedgeTracker:
+    """记录上游延迟样本并统计对冲请求的次数与浪费"""
+
+    def __init__(self, window: int):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.wasted_requests = 0
+        self.wasted_tokens = 0
+
+    def record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def deadline(self) -> float:
+        """返回触发对冲的等待时间：延迟分位数，样本不足时使用固定延迟"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < Config.HEDGE_MIN_SAMPLES:
+            return Config.HEDGE_DELAY
+        rank = int(round(Config.HEDGE_PERCENTILE / 100 * (len(samples) - 1)))
+        return samples[min(max(rank, 0), len(samples) - 1)]
+
+    def add(self, field: str, value: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = sorted(self._latencies)
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "wasted_requests": self.wasted_requests,
+                "wasted_tokens": self.wasted_tokens,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+                "latency_samples": len(samples),
+                "latency_p50": samples[len(samples) // 2] if samples else None,
+            }
+
+
+hedge_tracker = HedgeTracker(Config.HEDGE_WINDOW)
+hedge_executor = ThreadPoolExecutor(max_workers=Config.HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+
+
+def get_hedge_stats() -> dict:
+    """获取对冲请求统计，用于调优成本/延迟权衡"""
+    stats = hedge_tracker.snapshot()
+    stats["enabled"] = Config.HEDGE_ENABLED
+    stats["deadline"] = hedge_tracker.deadline()
+    return stats
+
+
+def request_completion(
+    llm_client: OpenAI,
+    model: str,
+    messages: List[dict],
+    cancelled: threading.Event = None,
+    dispatched: threading.Event = None,
+    decode=None,
+):
     """
-    从英文文章中提取词汇（单词、词性、释义）
-    使用缓存避免重复处理相同内容
+    发送单次聊天补全请求（经过调度器排队，并记录成功请求的上游延迟）
+    返回 (内容, 响应)，调用失败、响应无效或排队超时时抛出 UpstreamError，
+    cancelled 被设置时（排队中或刚获得槽位）不再发送请求，抛出 SchedulerCancelled
+
+    参数:
+        cancelled: 取消事件（对冲竞争中共用），本请求得到有效结果时设置，使另一方不再调用上游
+        dispatched: 获得调度槽位后设置的事件（对冲计时从此开始）
+        decode: 在释放槽位前校验并转换内容的函数（抛出 UpstreamError 表示响应无效），
+                返回值代替内容作为结果
     """
-    # 清理文章文本
-    clean_article = clean_text(article)
+    lane = request_lane.get()
 
-    # 创建内容哈希作为缓存键
-    content_hash = hashlib.md5(f"{clean_article}-{difficulty}".encode()).hexdigest()
-    logger.info(f"开始提取词汇 - 难度: {difficulty}, 内容哈希: {content_hash[:8]}")
+    # 排队和调用都不超过剩余的延迟预算
+    queue_timeout, call_timeout = Config.SCHED_QUEUE_TIMEOUT, Config.LLM_TIMEOUT
+    remaining = remaining_budget()
+    if remaining is not None:
+        if remaining <= 0:
+            raise UpstreamError("已超出延迟预算")
+        queue_timeout = min(queue_timeout, remaining)
 
-    # 构造系统提示词
-    system_prompt = build_system_prompt(difficulty)
+    try:
+        lane = scheduler.acquire(lane, timeout=queue_timeout, cancelled=cancelled)
+    except SchedulerTimeout as e:
+        logger.warning("上游请求排队超时: %s", e)
+        raise UpstreamError(str(e)) from e
+    if dispatched is not None:
+        dispatched.set()
 
     try:
-        logger.info("调用OpenAI API...")
-        response = client.chat.completions.create(
-            model=Config.MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"## 需要分析的英文文章:\n{clean_article}"},
-            ],
-            response_format={"type": "json_object"},
-            temperature=Config.TEMPERATURE,
-            max_tokens=Config.MAX_TOKENS,
-        )
+        if cancelled is not None and cancelled.is_set():
+            raise SchedulerCancelled("已有对冲请求胜出，跳过调用")
+
+        remaining = remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                raise UpstreamError("排队后已超出延迟预算")
+            call_timeout = min(call_timeout, remaining)
+
+        started = time.monotonic()
+        try:
+            response = llm_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=Config.TEMPERATURE,
+                max_tokens=Config.MAX_TOKENS,
+                timeout=call_timeout,
+            )
+        finally:
+            # 失败（超时、错误）的调用同样计入，按超时时间封顶：
+            # 否则长尾请求永远进不了统计窗口，对冲阈值偏低，对冲发送过早
+            hedge_tracker.record_latency(min(time.monotonic() - started, call_timeout))
 
         # 验证API响应
         if not response or not response.choices:
             logger.error("API返回无效响应")
-            return []
+            raise UpstreamError("API返回无效响应")
 
         first_choice = response.choices[0]
         if not first_choice.message or not first_choice.message.content:
             logger.error("API响应缺少内容")
-            return []
+            raise UpstreamError("API响应缺少内容")
 
         result = first_choice.message.content
-        vocab_data = parse_vocabulary_response(result)
+        if decode is not None:
+            result = decode(result)
+
+        # 结果有效：先取消同一竞争中仍在排队的请求再释放槽位，避免槽位被失败方抢到
+        if cancelled is not None:
+            scheduler.cancel(cancelled)
+    except (UpstreamError, SchedulerCancelled):
+        raise
+    except Exception as e:
+        logger.error("API调用失败: %s", e, exc_info=True)
+        raise UpstreamError(str(e)) from e
+    finally:
+        scheduler.release(lane)
 
-        logger.info(f"成功提取 {len(vocab_data)} 个词汇项")
-        return vocab_data
+    return result, response
 
-    except Exception as e:
-        logger.error(f"API调用失败: {str(e)}", exc_info=True)
-        return []
+
+def decode_vocabulary(content: str) -> List[VocabItem]:
+    """
+    校验并解析词汇JSON
+    响应不是有效JSON或缺少 vocabulary 字段时抛出 UpstreamError：
+    无效响应不能在对冲竞争中胜出，也不会以空结果写入缓存
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        logger.error("JSON解析失败: %s", e.msg)
+        logger.debug("错误位置: %d:%d, 原始响应: %s...", e.lineno, e.colno, content[:200])
+        raise UpstreamError(f"响应不是有效的JSON: {e.msg}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("vocabulary"), list):
+        logger.error("响应缺少 'vocabulary' 字段")
+        raise UpstreamError("响应缺少 'vocabulary' 字段")
+
+    return parse_vocabulary_response(data)
+
+
+def request_vocabulary(llm_client: OpenAI, model: str, messages: List[dict], cancelled=None, dispatched=None):
+    """
+    发送请求并在释放调度槽位前校验、解析响应，返回 (词汇列表, 响应)
+    cancelled/dispatched 参数见 request_completion
+    """
+    return request_completion(llm_client, model, messages, cancelled, dispatched, decode=decode_vocabulary)
+
+
+def _discard_loser(future):
+    """对冲失败方的回调：统计已发出的请求及其浪费的token（在排队中被取消的请求不计入）"""
+    if future.cancelled() or isinstance(future.exception(), SchedulerCancelled):
+        return
+    hedge_tracker.add("wasted_requests")
+    if future.exception() is not None:
+        return
+    _, response = future.result()
+    usage = getattr(response, "usage", None)
+    if usage and usage.total_tokens:
+        hedge_tracker.add("wasted_tokens", usage.total_tokens)
+
+
+def hedged_completion(messages: List[dict]) -> List[VocabItem]:
+    """
+    带对冲的请求：主请求获得调度槽位后超过延迟分位数仍未返回（或在此之前已失败）时，
+    向备用模型/端点发送重复请求，先返回有效词汇JSON者胜出
+    另一方仍在排队时直接取消；已发出的HTTP请求无法中断，其结果直接丢弃
+    返回解析后的词汇列表
+    """
+    remaining = remaining_budget()
+    if remaining is not None and remaining <= 0:
+        raise UpstreamError("已超出延迟预算")
+
+    hedge_tracker.add("requests")
+    if not Config.HEDGE_ENABLED:
+        return request_vocabulary(client, Config.MODEL, messages)[0]
+
+    cancelled, dispatched = threading.Event(), threading.Event()
+
+    # 复制上下文，使后台线程中的请求保留调度信息
+    primary = hedge_executor.submit(
+        contextvars.copy_context().run, request_vocabulary, client, Config.MODEL, messages, cancelled, dispatched
+    )
+    # 对冲计时从主请求获得调度槽位（或提前结束）时开始，排队时间不计入：
+    # 对冲请求同样需要排队，因排队而对冲只会加重拥塞
+    primary.add_done_callback(lambda _: dispatched.set())
+    dispatched.wait()
+    done, _ = wait([primary], timeout=hedge_tracker.deadline())
+    if done and primary.exception() is None:
+        return primary.result()[0]
+
+    if done:
+        # 主请求在对冲阈值之前就已失败，无需等待，立即改用备用端点
+        logger.info("主请求失败，立即发送对冲请求 (model=%s)", Config.HEDGE_MODEL)
+    else:
+        logger.info("主请求超过对冲阈值，发送对冲请求 (model=%s)", Config.HEDGE_MODEL)
+    hedge_tracker.add("hedges")
+    hedge = hedge_executor.submit(
+        contextvars.copy_context().run, request_vocabulary, hedge_client, Config.HEDGE_MODEL, messages, cancelled
+    )
+
+    pending = {hedge} if done else {primary, hedge}
+    error = primary.exception() if done else None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                error = future.exception()
+                continue
+            # 胜出方在释放槽位前已设置取消事件，仍在排队的失败方不会再调用上游；尚未开始的直接取消
+            # 同一轮 wait 中同样成功完成的另一方也是失败方，需要统计其浪费
+            losers = set(pending)
+            losers.update(f for f in done if f is not future and f.exception() is None)
+            for loser in losers:
+                loser.cancel()
+                loser.add_done_callback(_discard_loser)
+            if future is hedge:
+                hedge_tracker.add("hedge_wins")
+            return future.result()[0]
+
+    raise error
+
+
+@lru_cache(maxsize=Config.CACHE_SIZE)
+def extract_vocabulary(article: str, difficulty: str = "medium") -> List[VocabItem]:
+    """
+    从英文文章中提取词汇（单词、词性、释义）
+    使用缓存避免重复处理相同内容
+    上游调用失败或响应无效时抛出 UpstreamError（失败结果不会被缓存）
+    """
+    # 清理文章文本
+    clean_article = clean_text(article)
+
+    # 创建内容哈希用于日志追踪（仅在调试级别计算）
+    if logger.isEnabledFor(logging.DEBUG):
+        content_hash = hashlib.md5(f"{clean_article}-{difficulty}".encode()).hexdigest()
+        logger.debug("开始提取词汇 - 难度: %s, 内容哈希: %s", difficulty, content_hash[:8], extra=SAMPLED)
+
+    # 构造系统提示词
+    system_prompt = build_system_prompt(difficulty)
+
+    logger.debug("调用OpenAI API...", extra=SAMPLED)
+    vocab_data = hedged_completion(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"## 需要分析的英文文章:\n{clean_article}"},
+        ]
+    )
+
+    logger.debug("成功提取 %d 个词汇项", len(vocab_data), extra=SAMPLED)
+    return vocab_data
 
 
 # ====================== 高级功能接口 ======================
-def extract_by_paragraphs(text: str, difficulty: str = "medium") -> List[dict]:
+def extract_segment(para: str, difficulty: str) -> tuple:
+    """
+    提取单个段落的词汇，必要时降级为离线提取
+    超出延迟预算后仍先查询缓存：已缓存的段落直接返回完整结果，未缓存的段落不再调用上游
+
+    返回:
+        tuple: (词汇列表, 是否为完整的LLM结果)，离线降级或上游失败（未启用降级）时为False
+    """
+    try:
+        return extract_vocabulary(para, difficulty), True
+    except UpstreamError as e:
+        if not Config.OFFLINE_FALLBACK:
+            logger.warning("上游不可用，段落无结果: %s", e)
+            return [], False
+        logger.warning("上游不可用，使用离线提取: %s", e)
+        return extract_offline(para, difficulty, Config.LOCAL_LEXICON_PATH), False
+
+
+def extract_batch(
+    text: str, difficulty: str = "medium", priority: str = INTERACTIVE, client_id: str = None
+) -> VocabBatch:
     """
     分段处理文章并合并结果
-    返回包含段落标记的词汇列表
+    返回列式存储的词汇批次（适合大规模语料），段落号记录在批次中
+
+    上游失败或总耗时超过 LATENCY_BUDGET 时，剩余段落改用离线降级提取，
+    降级得到的词汇项带有 degraded=True 标记；降级或失败的段落数记录在
+    batch.incomplete_segments 中（batch.complete 为False的结果不应被缓存或写入索引）
+
+    参数:
+        priority: 调度通道（interactive/batch），批量任务使用 batch 以免挤占交互请求
+        client_id: 客户端IP，用于配额限制
+
+    异常:
+        QuotaExceeded: 超出该IP的配额（在发送任何段落之前检查，每篇文章只计一次）
     """
+    scheduler.admit(client_id)
+    token = request_lane.set(priority)
+    # 仅在启用离线降级时限制总耗时（否则超出预算的段落没有结果）
+    deadline = time.monotonic() + Config.LATENCY_BUDGET if Config.OFFLINE_FALLBACK else None
+    deadline_token = request_deadline.set(deadline)
+    try:
+        return _extract_batch(text, difficulty)
+    finally:
+        request_deadline.reset(deadline_token)
+        request_lane.reset(token)
+        scheduler.finish(client_id)
+
+
+def _extract_batch(text: str, difficulty: str) -> VocabBatch:
+    """分段提取的实现（调度信息已在 request_lane 中）"""
     paragraphs = split_by_word_count(text, Config.WORDS_PER_SEGMENT, Config.MIN_SEGMENT_WORDS)
-    all_vocab = []
-    logger.info(f"开始分段处理，共 {len(paragraphs)} 个段落")
+    batch = VocabBatch()
+    logger.info("开始分段处理，共 %d 个段落", len(paragraphs))
 
     for idx, para in enumerate(paragraphs, 1):
-        logger.info(f"处理第 {idx}/{len(paragraphs)} 段落 (长度: {len(para)} 字符)")
-        vocab_list = extract_vocabulary(para, difficulty)
-
-        # 添加段落标记
-        for item in vocab_list:
-            item["paragraph"] = idx
+        logger.debug("处理第 %d/%d 段落 (长度: %d 字符)", idx, len(paragraphs), len(para), extra=SAMPLED)
+        # 添加段落标记（批次中单独存储，不修改缓存中的词汇项）
+        items, complete = extract_segment(para, difficulty)
+        batch.extend(items, paragraph=idx)
+        if not complete:
+            batch.incomplete_segments += 1
+
+    logger.info(
+        "处理完成，共提取 %d 个词汇项（%d 个段落未得到完整结果）", len(batch), batch.incomplete_segments
+    )
+    return batch
 
-        all_vocab.extend(vocab_list)
 
-    logger.info(f"处理完成，共提取 {len(all_vocab)} 个词汇项")
-    return all_vocab
+def extract_by_paragraphs(
+    text: str, difficulty: str = "medium", priority: str = INTERACTIVE, client_id: str = None
+) -> List[dict]:
+    """
+    分段处理文章并合并结果
+    返回包含段落标记的词汇列表（JSON结构）
+    """
+    return extract_batch(text, difficulty, priority, client_id).to_dicts()
 
 
 def save_vocabulary_to_file(
@@ -453,10 +815,10 @@ def save_vocabulary_to_file(
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(vocab_list, f, ensure_ascii=False, indent=2)
-        logger.info(f"词汇表已保存到 {filename}")
+        logger.info("词汇表已保存到 %s", filename)
         return True
     except Exception as e:
-        logger.error(f"保存文件失败: {str(e)}")
+        logger.error("保存文件失败: %s", e)
         return False
 
 
@@ -19,75 +19,237 @@ function getPosName(posAbbr) {
     return POS_MAP[posAbbr] || '其他词性';
 }
 
-// 渲染词汇列表
-function renderVocabularyList(vocabList) {
-    const container = $('#vocabularyList');
-    container.empty();
+// 虚拟列表：可见范围上下额外渲染的行数
+const VIRTUAL_OVERSCAN_ROWS = 2;
+
+// 虚拟列表状态
+const virtualList = {
+    allItems: [],        // 全部词汇
+    visibleIndexes: [],  // 通过筛选的词汇在 allItems 中的下标
+    filters: { type: '', pos: '', paragraph: '' },
+    posValues: new Set(),
+    paragraphValues: new Set(),
+    columns: 1,
+    rowHeight: 0,
+    pool: [],            // 可复用的卡片节点
+    extractedAt: '',
+    frame: null
+};
+
+// 根据窗口宽度获取每行卡片数（与 col-md-6 col-lg-4 对应）
+function getColumnCount() {
+    const width = window.innerWidth;
+    if (width >= 992) return 3;
+    if (width >= 768) return 2;
+    return 1;
+}
+
+// 判断词汇是否符合当前筛选条件
+function matchesFilters(item) {
+    const filters = virtualList.filters;
+    return (!filters.type || item.type === filters.type)
+        && (!filters.pos || item.pos === filters.pos)
+        && (!filters.paragraph || String(item.paragraph) === filters.paragraph);
+}
+
+// 从模板创建卡片节点，并缓存需要填充的子元素
+function createCardNode() {
+    const node = document.getElementById('vocabCardTemplate').content.firstElementChild.cloneNode(true);
+    node._fields = {};
+    node.querySelectorAll('[data-field]').forEach(el => {
+        node._fields[el.dataset.field] = el;
+    });
+    // 展开后在卡片内滚动查看被截断的内容（卡片高度固定，不影响虚拟列表的行高计算）
+    node._fields.expand.addEventListener('click', () => {
+        const card = node.querySelector('.vocab-card');
+        const expanded = card.classList.toggle('expanded');
+        node._fields.expand.textContent = expanded ? '收起' : '展开全部';
+        if (!expanded) node._fields.content.scrollTop = 0;
+    });
+    return node;
+}
+
+// 标记内容超出固定卡片高度的卡片（需在卡片插入DOM后调用）
+function markClippedCard(node) {
+    const content = node._fields.content;
+    const card = node.querySelector('.vocab-card');
+    card.classList.toggle('is-clipped', content.scrollHeight > content.clientHeight + 1);
+}
+
+// 用词汇数据填充卡片（使用 textContent，无需拼接HTML）
+function fillCardNode(node, item, index) {
+    const fields = node._fields;
+    const isPhrase = item.type === 'phrase';
+    const commonUsage = item['common-usage'] || [];
+    const usages = Array.isArray(commonUsage) ? commonUsage : [commonUsage];
     
-    if (vocabList.length === 0) {
-        container.html('<div class="col-12 text-center py-4 text-muted">没有提取到任何词汇</div>');
-        return;
+    fields.word.textContent = item.word;
+    fields.pos.textContent = item.pos;
+    fields.type.textContent = isPhrase ? '词组' : '单词';
+    fields.type.className = `badge ${isPhrase ? 'bg-warning' : 'bg-info'}`;
+    fields.degraded.style.display = item.degraded ? '' : 'none';
+    fields.posName.textContent = getPosName(item.pos);
+    fields.index.textContent = `#${index + 1}`;
+    fields.definition.textContent = item.definition || '暂无释义';
+    fields.definitionCh.textContent = item['definition-ch'] || '';
+    fields.definitionChBlock.style.display = item['definition-ch'] ? '' : 'none';
+    fields.time.textContent = virtualList.extractedAt;
+    
+    // 复用的节点需要重置展开状态
+    node.querySelector('.vocab-card').classList.remove('expanded');
+    fields.expand.textContent = '展开全部';
+    fields.content.scrollTop = 0;
+    
+    fields.usageBlock.style.display = usages.length ? '' : 'none';
+    fields.usage.replaceChildren(...usages.map(usage => {
+        const badge = document.createElement('span');
+        badge.className = 'badge bg-info me-1 mb-1';
+        badge.textContent = usage;
+        return badge;
+    }));
+}
+
+// 渲染当前滚动位置可见的卡片
+function renderVisibleCards() {
+    virtualList.frame = null;
+    
+    const viewport = document.getElementById('vocabularyViewport');
+    const windowEl = document.getElementById('vocabularyList');
+    const spacer = document.getElementById('vocabularySpacer');
+    const indexes = virtualList.visibleIndexes;
+    const columns = virtualList.columns;
+    
+    // 首次渲染时测量行高
+    if (!virtualList.rowHeight) {
+        const probe = virtualList.pool[0] || createCardNode();
+        virtualList.pool[0] = probe;
+        windowEl.appendChild(probe);
+        virtualList.rowHeight = probe.offsetHeight;
     }
     
-    vocabList.forEach((item, index) => {
-        const posName = getPosName(item.pos);
-        const commonUsage = item['common-usage'] || [];
-        const usageText = Array.isArray(commonUsage) ? commonUsage.join(' • ') : commonUsage;
-        const isPhrase = item.type === 'phrase';
-        
-        const card = `
-        <div class="col-md-6 col-lg-4">
-            <div class="vocab-card card mb-3 fade-in" style="animation-delay: ${index * 0.1}s;">
-                <div class="card-body">
-                    <div class="d-flex justify-content-between align-items-start mb-2">
-                        <div class="flex-grow-1">
-                            <h5 class="word-header card-title mb-1">${item.word}</h5>
-                            <div class="d-flex align-items-center gap-2">
-                                <span class="pos-badge badge">${item.pos}</span>
-                                <span class="badge ${isPhrase ? 'bg-warning' : 'bg-info'}">${isPhrase ? '词组' : '单词'}</span>
-                                <small class="text-muted">${posName}</small>
-                            </div>
-                        </div>
-                        <span class="badge bg-secondary">#${index + 1}</span>
-                    </div>
-                    
-                    <div class="mb-3">
-                        <h6 class="text-primary mb-1">
-                            <i class="bi bi-translate"></i> 英文释义
-                        </h6>
-                        <p class="card-text mb-2">${item.definition || '暂无释义'}</p>
-                        
-                        ${item['definition-ch'] ? `
-                        <h6 class="text-success mb-1">
-                            <i class="bi bi-chat-quote"></i> 中文释义
-                        </h6>
-                        <p class="card-text text-success">${item['definition-ch']}</p>
-                        ` : ''}
-                    </div>
-                    
-                    ${usageText ? `
-                    <div class="mb-3">
-                        <h6 class="text-info mb-1">
-                            <i class="bi bi-lightning"></i> 常见用法
-                        </h6>
-                        <div class="usage-tags">
-                            ${usageText.split(' • ').map(usage => 
-                                `<span class="badge bg-info me-1 mb-1">${usage}</span>`
-                            ).join('')}
-                        </div>
-                    </div>
-                    ` : ''}
-                    
-                    <div class="card-footer bg-transparent border-0 px-0 pb-0">
-                        <small class="text-muted">
-                            <i class="bi bi-clock"></i> 提取时间: ${new Date().toLocaleTimeString()}
-                        </small>
-                    </div>
-                </div>
-            </div>
-        </div>`;
-        container.append(card);
+    // 容器隐藏时无法测量，暂用CSS中的默认行高
+    const rowHeight = virtualList.rowHeight || 340;
+    const totalRows = Math.ceil(indexes.length / columns);
+    spacer.style.height = `${totalRows * rowHeight}px`;
+    
+    const firstRow = Math.max(0, Math.floor(viewport.scrollTop / rowHeight) - VIRTUAL_OVERSCAN_ROWS);
+    const lastRow = Math.min(totalRows, Math.ceil((viewport.scrollTop + viewport.clientHeight) / rowHeight) + VIRTUAL_OVERSCAN_ROWS);
+    const start = firstRow * columns;
+    const end = Math.min(indexes.length, lastRow * columns);
+    
+    // 复用卡片节点，只补充不足的部分
+    while (virtualList.pool.length < end - start) {
+        virtualList.pool.push(createCardNode());
+    }
+    
+    const fragment = document.createDocumentFragment();
+    for (let i = start; i < end; i++) {
+        const node = virtualList.pool[i - start];
+        const itemIndex = indexes[i];
+        fillCardNode(node, virtualList.allItems[itemIndex], itemIndex);
+        fragment.appendChild(node);
+    }
+    const nodes = virtualList.pool.slice(0, end - start);
+    windowEl.replaceChildren(fragment);
+    windowEl.style.transform = `translateY(${firstRow * rowHeight}px)`;
+    nodes.forEach(markClippedCard);
+}
+
+// 合并同一帧内的多次渲染请求
+function scheduleRender() {
+    if (virtualList.frame === null) {
+        virtualList.frame = requestAnimationFrame(renderVisibleCards);
+    }
+}
+
+// 更新筛选结果统计和空状态
+function updateFilterSummary() {
+    const total = virtualList.allItems.length;
+    const shown = virtualList.visibleIndexes.length;
+    const empty = $('#vocabularyEmpty');
+    
+    $('#filterSummary').text(shown === total ? `共 ${total} 项` : `显示 ${shown} / ${total} 项`);
+    if (shown === 0) {
+        empty.text(total === 0 ? '没有提取到任何词汇' : '没有符合筛选条件的词汇').show();
+        $('#vocabularyViewport').hide();
+    } else {
+        empty.hide();
+        $('#vocabularyViewport').show();
+    }
+}
+
+// 用新出现的词性和段落补充筛选选项
+function updateFilterOptions(items) {
+    let posChanged = false;
+    let paragraphChanged = false;
+    items.forEach(item => {
+        if (item.pos && !virtualList.posValues.has(item.pos)) {
+            virtualList.posValues.add(item.pos);
+            posChanged = true;
+        }
+        if (item.paragraph !== undefined && !virtualList.paragraphValues.has(item.paragraph)) {
+            virtualList.paragraphValues.add(item.paragraph);
+            paragraphChanged = true;
+        }
+    });
+    
+    if (posChanged) {
+        const select = $('#filterPos');
+        select.find('option:not(:first)').remove();
+        [...virtualList.posValues].sort().forEach(pos => {
+            select.append($('<option>').val(pos).text(`${pos} ${getPosName(pos)}`));
+        });
+        select.val(virtualList.filters.pos);
+    }
+    if (paragraphChanged) {
+        const select = $('#filterParagraph');
+        select.find('option:not(:first)').remove();
+        [...virtualList.paragraphValues].sort((a, b) => a - b).forEach(paragraph => {
+            select.append($('<option>').val(String(paragraph)).text(`第 ${paragraph} 段`));
+        });
+        select.val(virtualList.filters.paragraph);
+    }
+}
+
+// 重新计算筛选结果并回到顶部
+function applyFilters() {
+    const items = virtualList.allItems;
+    const indexes = [];
+    for (let i = 0; i < items.length; i++) {
+        if (matchesFilters(items[i])) indexes.push(i);
+    }
+    virtualList.visibleIndexes = indexes;
+    $('#vocabularyViewport').scrollTop(0);
+    updateFilterSummary();
+    scheduleRender();
+}
+
+// 渲染词汇列表（虚拟滚动，只有可见范围内的卡片在DOM中）
+function renderVocabularyList(vocabList) {
+    virtualList.allItems = [];
+    virtualList.visibleIndexes = [];
+    virtualList.posValues.clear();
+    virtualList.paragraphValues.clear();
+    virtualList.columns = getColumnCount();
+    virtualList.extractedAt = new Date().toLocaleTimeString();
+    virtualList.filters = { type: '', pos: '', paragraph: '' };
+    $('#filterPos, #filterParagraph').find('option:not(:first)').remove();
+    $('#filterType, #filterPos, #filterParagraph').val('');
+    
+    appendVocabulary(vocabList);
+    applyFilters();
+}
+
+// 增量追加词汇（只对新词汇做筛选，不重建已有结果）
+function appendVocabulary(items) {
+    const offset = virtualList.allItems.length;
+    items.forEach((item, i) => {
+        virtualList.allItems.push(item);
+        if (matchesFilters(item)) virtualList.visibleIndexes.push(offset + i);
     });
+    updateFilterOptions(items);
+    updateFilterSummary();
+    scheduleRender();
 }
 
 // 显示加载动画
@@ -113,22 +275,72 @@ function showSuccess(message) {
     console.log('成功: ' + message);
 }
 
+// 提取结果缓存的键前缀（sessionStorage，刷新页面后仍可配合ETag复用）
+const EXTRACT_CACHE_PREFIX = 'extract:';
+
+// 生成缓存键（简单字符串哈希；是否可复用最终由服务端ETag判断）
+function getExtractCacheKey(article, difficulty) {
+    const text = `${difficulty}\n${article}`;
+    let hash = 5381;
+    for (let i = 0; i < text.length; i++) {
+        hash = ((hash << 5) + hash + text.charCodeAt(i)) | 0;
+    }
+    return `${EXTRACT_CACHE_PREFIX}${(hash >>> 0).toString(16)}:${text.length}`;
+}
+
+// 读取缓存的提取结果
+function loadCachedExtraction(key) {
+    try {
+        return JSON.parse(sessionStorage.getItem(key));
+    } catch (error) {
+        return null;
+    }
+}
+
+// 保存提取结果及其ETag
+function saveCachedExtraction(key, etag, response) {
+    try {
+        sessionStorage.setItem(key, JSON.stringify({ etag: etag, response: response }));
+    } catch (error) {
+        // 存储空间不足时忽略，下次重新请求即可
+        console.log('缓存提取结果失败:', error);
+    }
+}
+
 // 处理词汇提取
 function handleExtractVocabulary(article, difficulty) {
     showLoading();
     
+    const cacheKey = getExtractCacheKey(article, difficulty);
+    const cached = loadCachedExtraction(cacheKey);
+    
     $.ajax({
         url: '/extract',
         type: 'POST',
         contentType: 'application/json',
+        headers: cached && cached.etag ? { 'If-None-Match': cached.etag } : {},
         data: JSON.stringify({
             article: article,
             difficulty: difficulty
         }),
-        success: function(response) {
+        success: function(response, status, xhr) {
             console.log('请求成功，响应:', response);
             hideLoading();
             
+            // 304：服务端确认结果未变化，直接使用本地缓存
+            if (xhr.status === 304 && cached) {
+                response = cached.response;
+            } else if (xhr.getResponseHeader('ETag')) {
+                saveCachedExtraction(cacheKey, xhr.getResponseHeader('ETag'), response);
+            } else {
+                // 不完整的结果（降级或失败）不带ETag，清除旧缓存，下次提交重新请求上游
+                try {
+                    sessionStorage.removeItem(cacheKey);
+                } catch (error) {
+                    // sessionStorage 不可用时无需处理
+                }
+            }
+            
             if (response.error) {
                 showError(response.error);
                 return;
@@ -150,6 +362,11 @@ function handleExtractVocabulary(article, difficulty) {
             }
             $('#resultCount').text(countText);
             
+            // 提示离线降级结果
+            if (response.degraded) {
+                showError(`AI服务暂时不可用，其中 ${response.degraded_count} 个词汇由本地离线提取，释义可能缺失`);
+            }
+            
             // 渲染词汇列表
             renderVocabularyList(currentVocabulary);
             
@@ -300,6 +517,28 @@ function initApp() {
         $(this).toggleClass('is-invalid', !isValid);
     });
     
+    // 结果筛选
+    $('#filterType, #filterPos, #filterParagraph').on('change', function() {
+        virtualList.filters = {
+            type: $('#filterType').val(),
+            pos: $('#filterPos').val(),
+            paragraph: $('#filterParagraph').val()
+        };
+        applyFilters();
+    });
+    
+    // 滚动时只渲染可见卡片
+    $('#vocabularyViewport').on('scroll', scheduleRender);
+    
+    // 窗口大小变化时重新计算列数
+    $(window).on('resize', function() {
+        const columns = getColumnCount();
+        if (columns !== virtualList.columns) {
+            virtualList.columns = columns;
+            scheduleRender();
+        }
+    });
+    
     // 难度选择变化
     $('input[name="difficulty"]').on('change', function() {
         $('.form-check-input').removeClass('is-valid');
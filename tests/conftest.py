@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# extractor 在导入时读取配置并创建日志目录，需在导入前设置
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="vocab-test-logs-"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
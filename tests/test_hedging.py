@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import extractor
+from extractor import Config, HedgeTracker, UpstreamError, hedged_completion
+from utils.llm_scheduler import LLMScheduler
+
+VOCAB = {"vocabulary": [{"word": "resilient", "pos": "adj.", "definition": "able to recover quickly"}]}
+
+
+class FakeClient:
+    """模拟 OpenAI 客户端：延迟 delay 秒后返回 content，或抛出 error"""
+
+    def __init__(self, content=None, delay=0.0, error=None, tokens=100):
+        self.content = content
+        self.delay = delay
+        self.error = error
+        self.tokens = tokens
+        self.calls = 0
+        self.finished = threading.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        try:
+            time.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+                usage=SimpleNamespace(total_tokens=self.tokens),
+            )
+        finally:
+            self.finished.set()
+
+
+def vocab(word):
+    return json.dumps({"vocabulary": [dict(VOCAB["vocabulary"][0], word=word)]})
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = HedgeTracker(Config.HEDGE_WINDOW)
+    monkeypatch.setattr(extractor, "hedge_tracker", tracker)
+    monkeypatch.setattr(extractor, "scheduler", LLMScheduler(max_concurrent=4))
+    monkeypatch.setattr(Config, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(Config, "HEDGE_DELAY", 0.1)
+    monkeypatch.setattr(Config, "HEDGE_MIN_SAMPLES", 1000)
+    return tracker
+
+
+def use_clients(monkeypatch, primary, hedge):
+    monkeypatch.setattr(extractor, "client", primary)
+    monkeypatch.setattr(extractor, "hedge_client", hedge)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_primary_wins_without_hedge(monkeypatch, tracker):
+    primary, hedge = FakeClient(vocab("primary")), FakeClient(vocab("hedge"))
+    use_clients(monkeypatch, primary, hedge)
+
+    items = hedged_completion([])
+
+    assert [item.word for item in items] == ["primary"]
+    assert hedge.calls == 0
+    assert tracker.hedges == 0
+
+
+def test_hedge_wins_and_slow_primary_is_wasted(monkeypatch, tracker):
+    primary = FakeClient(vocab("primary"), delay=0.5, tokens=250)
+    hedge = FakeClient(vocab("hedge"))
+    use_clients(monkeypatch, primary, hedge)
+
+    items = hedged_completion([])
+
+    assert [item.word for item in items] == ["hedge"]
+    assert (tracker.hedges, tracker.hedge_wins) == (1, 1)
+    # 已发出的主请求完成后计入浪费
+    assert wait_for(lambda: tracker.wasted_requests == 1)
+    assert wait_for(lambda: tracker.wasted_tokens == 250)
+
+
+def test_primary_wins_after_hedge_is_sent(monkeypatch, tracker):
+    primary = FakeClient(vocab("primary"), delay=0.2)
+    hedge = FakeClient(vocab("hedge"), delay=0.6, tokens=80)
+    use_clients(monkeypatch, primary, hedge)
+
+    items = hedged_completion([])
+
+    assert [item.word for item in items] == ["primary"]
+    assert (tracker.hedges, tracker.hedge_wins) == (1, 0)
+    assert wait_for(lambda: tracker.wasted_tokens == 80)
+
+
+def test_failed_primary_hedges_immediately(monkeypatch, tracker):
+    monkeypatch.setattr(Config, "HEDGE_DELAY", 5)
+    primary = FakeClient(error=RuntimeError("connection reset"))
+    hedge = FakeClient(vocab("hedge"))
+    use_clients(monkeypatch, primary, hedge)
+
+    started = time.monotonic()
+    items = hedged_completion([])
+
+    assert [item.word for item in items] == ["hedge"]
+    assert time.monotonic() - started < 1
+    assert tracker.hedge_wins == 1
+
+
+def test_invalid_json_cannot_win(monkeypatch, tracker):
+    primary = FakeClient("not json")
+    hedge = FakeClient(vocab("hedge"), delay=0.05)
+    use_clients(monkeypatch, primary, hedge)
+
+    items = hedged_completion([])
+
+    assert [item.word for item in items] == ["hedge"]
+
+
+def test_both_sides_failing_raises_upstream_error(monkeypatch, tracker):
+    primary = FakeClient(error=RuntimeError("primary down"))
+    hedge = FakeClient(error=RuntimeError("hedge down"))
+    use_clients(monkeypatch, primary, hedge)
+
+    with pytest.raises(UpstreamError):
+        hedged_completion([])
+    assert tracker.hedges == 1
+    assert tracker.hedge_wins == 0
+
+
+def test_failed_call_latency_is_recorded(monkeypatch, tracker):
+    use_clients(monkeypatch, FakeClient(error=RuntimeError("boom"), delay=0.05), FakeClient(vocab("hedge")))
+    monkeypatch.setattr(Config, "HEDGE_ENABLED", False)
+
+    with pytest.raises(UpstreamError):
+        hedged_completion([])
+    assert tracker.snapshot()["latency_samples"] == 1
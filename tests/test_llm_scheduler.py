@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from utils.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler, QuotaExceeded, SchedulerCancelled, SchedulerTimeout
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def queued(scheduler):
+    return sum(scheduler.snapshot()["queued"].values())
+
+
+def test_lanes_share_slots_by_weight():
+    scheduler = LLMScheduler(max_concurrent=1, weights={INTERACTIVE: 4.0, BATCH: 1.0}, interactive_reserve=0)
+    order = []
+
+    def worker(lane):
+        granted = scheduler.acquire(lane)
+        order.append(granted)
+        scheduler.release(granted)
+
+    # 占住唯一的槽位，让所有请求先排队
+    held = scheduler.acquire(INTERACTIVE)
+    threads = [threading.Thread(target=worker, args=(lane,)) for lane in [INTERACTIVE] * 20 + [BATCH] * 20]
+    for thread in threads:
+        thread.start()
+    assert wait_for(lambda: queued(scheduler) == 40)
+
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    first = order[:20]
+    assert first.count(INTERACTIVE) == 16
+    assert first.count(BATCH) == 4
+
+
+def test_batch_cannot_take_reserved_slots():
+    scheduler = LLMScheduler(max_concurrent=2, interactive_reserve=1)
+    held = scheduler.acquire(BATCH)
+
+    with pytest.raises(SchedulerTimeout):
+        scheduler.acquire(BATCH, timeout=0.1)
+    # 预留槽位仍可供交互请求使用
+    assert scheduler.acquire(INTERACTIVE, timeout=0.1) == INTERACTIVE
+    assert scheduler.snapshot()["background_in_flight"] == 1
+
+    scheduler.release(held)
+    scheduler.release(INTERACTIVE)
+    assert scheduler.snapshot()["in_flight"] == 0
+
+
+def test_cancelled_queued_ticket_is_not_granted():
+    scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    held = scheduler.acquire(INTERACTIVE)
+    cancelled = threading.Event()
+    errors = []
+
+    def worker():
+        try:
+            scheduler.acquire(INTERACTIVE, cancelled=cancelled)
+        except SchedulerCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert wait_for(lambda: queued(scheduler) == 1)
+
+    # 先取消再释放：槽位不能交给已取消的请求
+    cancelled.set()
+    scheduler.release(held)
+    thread.join(timeout=2)
+
+    assert len(errors) == 1
+    snapshot = scheduler.snapshot()
+    assert snapshot["in_flight"] == 0
+    assert snapshot["queued"][INTERACTIVE] == 0
+    assert snapshot["dispatched"][INTERACTIVE] == 1
+
+
+def test_cancel_wakes_queued_request():
+    scheduler = LLMScheduler(max_concurrent=1, interactive_reserve=0)
+    held = scheduler.acquire(INTERACTIVE)
+    cancelled = threading.Event()
+    errors = []
+
+    def worker():
+        try:
+            scheduler.acquire(INTERACTIVE, cancelled=cancelled)
+        except SchedulerCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert wait_for(lambda: queued(scheduler) == 1)
+
+    scheduler.cancel(cancelled)
+    thread.join(timeout=2)
+
+    assert len(errors) == 1
+    assert queued(scheduler) == 0
+    scheduler.release(held)
+
+
+def test_admit_limits_concurrent_extractions():
+    scheduler = LLMScheduler(client_max_pending=2)
+    scheduler.admit("1.2.3.4")
+    scheduler.admit("1.2.3.4")
+
+    with pytest.raises(QuotaExceeded):
+        scheduler.admit("1.2.3.4")
+    # 其他IP不受影响
+    scheduler.admit("5.6.7.8")
+
+    scheduler.finish("1.2.3.4")
+    scheduler.admit("1.2.3.4")
+    assert scheduler.snapshot()["rejected"] == 1
+
+
+def test_admit_limits_extractions_per_minute():
+    scheduler = LLMScheduler(client_max_pending=0, client_rate_per_minute=2)
+    for _ in range(2):
+        scheduler.admit("1.2.3.4")
+        scheduler.finish("1.2.3.4")
+
+    # finish() 不退还每分钟配额
+    with pytest.raises(QuotaExceeded):
+        scheduler.admit("1.2.3.4")
+
+
+def test_finish_releases_client_tracking():
+    scheduler = LLMScheduler(client_max_pending=1)
+    scheduler.admit("1.2.3.4")
+    assert scheduler.snapshot()["active_clients"] == 1
+
+    scheduler.finish("1.2.3.4")
+    assert scheduler.snapshot()["active_clients"] == 0
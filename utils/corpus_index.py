@@ -0,0 +1,287 @@
+import os
+import re
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+# 假设在其他模块中已经配置了logger
+logger = logging.getLogger(__name__)
+
+# 聚合所有难度的频次行使用的难度标记
+ALL_DIFFICULTIES = "*"
+
+# 单次查询返回的最大条数（完整导出请使用 export_terms）
+MAX_QUERY_LIMIT = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    title TEXT,
+    created_at TEXT NOT NULL,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (hash, difficulty)
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL DEFAULT 'word',
+    pos TEXT NOT NULL DEFAULT '',
+    definition TEXT NOT NULL DEFAULT '',
+    definition_ch TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS occurrences (
+    term_id INTEGER NOT NULL,
+    article_id INTEGER NOT NULL,
+    paragraph INTEGER NOT NULL,
+    PRIMARY KEY (term_id, article_id, paragraph)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS term_freq (
+    term_id INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    type TEXT NOT NULL,
+    freq INTEGER NOT NULL DEFAULT 0,
+    articles INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (term_id, difficulty)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_term_freq_rank ON term_freq (difficulty, freq DESC);
+"""
+
+
+def normalize_term(text: str) -> str:
+    """规范化词汇：小写、去除首尾标点、合并空白"""
+    text = re.sub(r"\s+", " ", str(text).lower()).strip()
+    return text.strip(".,;:!?\"'()[]{}")
+
+
+def article_hash(article: str) -> str:
+    """文章内容哈希（忽略空白差异）"""
+    return hashlib.md5(re.sub(r"\s+", " ", article).strip().encode()).hexdigest()
+
+
+class CorpusIndex:
+    """
+    基于SQLite的语料词汇索引（增量更新，持久化到磁盘）
+    记录每个规范化词汇出现在哪些文章和段落中，并按难度维护频次汇总，
+    常用查询均命中索引，语料规模达到数十万篇文章时仍保持毫秒级响应
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程使用独立连接（WAL模式下读写互不阻塞）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add_article(self, article: str, difficulty: str, vocab_list, title: str = None) -> bool:
+        """
+        将一篇文章的提取结果增量写入索引
+
+        参数:
+            article: 文章原文（用于计算内容哈希）
+            difficulty: 难度
+            vocab_list: 词汇字典列表（或 VocabItem/VocabBatch）
+            title: 文章标题（可选，默认取文章开头）
+
+        返回:
+            bool: 是否新增（同一文章同一难度重复提交时返回False）
+        """
+        items = [item.to_dict() if hasattr(item, "to_dict") else item for item in vocab_list]
+        content_hash = article_hash(article)
+        title = title or re.sub(r"\s+", " ", article).strip()[:80]
+
+        # 按规范化词汇聚合本文中的出现位置
+        occurrences = {}
+        for item in items:
+            term = normalize_term(item.get("word", ""))
+            if not term:
+                continue
+            entry = occurrences.setdefault(term, {"item": item, "paragraphs": set()})
+            entry["paragraphs"].add(item.get("paragraph") or 0)
+
+        with self._write_lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO articles (hash, difficulty, title, created_at, item_count) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (content_hash, difficulty, title, datetime.now().isoformat(timespec="seconds"), len(items)),
+                    )
+                    if cursor.rowcount == 0:
+                        return False
+                    article_id = cursor.lastrowid
+
+                    for term, entry in occurrences.items():
+                        item = entry["item"]
+                        item_type = item.get("type", "word")
+                        term_id = self._upsert_term(conn, term, item, item_type)
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO occurrences (term_id, article_id, paragraph) VALUES (?, ?, ?)",
+                            [(term_id, article_id, p) for p in entry["paragraphs"]],
+                        )
+                        count = len(entry["paragraphs"])
+                        conn.executemany(
+                            "INSERT INTO term_freq (term_id, difficulty, type, freq, articles) VALUES (?, ?, ?, ?, 1) "
+                            "ON CONFLICT (term_id, difficulty) DO UPDATE SET "
+                            "freq = freq + excluded.freq, articles = articles + 1",
+                            [
+                                (term_id, difficulty, item_type, count),
+                                (term_id, ALL_DIFFICULTIES, item_type, count),
+                            ],
+                        )
+            except Exception as e:
+                logger.error("写入语料索引失败: %s", e, exc_info=True)
+                return False
+
+        logger.info("语料索引已更新：文章 %s，%d 个词汇", content_hash[:8], len(occurrences))
+        return True
+
+    @staticmethod
+    def _upsert_term(conn: sqlite3.Connection, term: str, item: dict, item_type: str) -> int:
+        """写入词汇，已存在时仅用非空释义补充"""
+        conn.execute(
+            "INSERT INTO terms (term, type, pos, definition, definition_ch) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (term) DO UPDATE SET "
+            "pos = CASE WHEN excluded.definition != '' THEN excluded.pos ELSE pos END, "
+            "definition = CASE WHEN excluded.definition != '' THEN excluded.definition ELSE definition END, "
+            "definition_ch = CASE WHEN excluded.definition_ch != '' THEN excluded.definition_ch ELSE definition_ch END",
+            (
+                term,
+                item_type,
+                item.get("pos", ""),
+                item.get("definition", ""),
+                item.get("definition-ch", ""),
+            ),
+        )
+        return conn.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()[0]
+
+    def find_articles(self, term: str, limit: int = 50) -> dict:
+        """查询包含某个词汇的文章及段落（limit 限制在 1..MAX_QUERY_LIMIT 之间）"""
+        limit = min(max(limit, 1), MAX_QUERY_LIMIT)
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM terms WHERE term = ?", (normalize_term(term),)).fetchone()
+        if row is None:
+            return {"term": normalize_term(term), "found": False, "articles": [], "frequency": {}}
+
+        # 先通过主键索引倒序取最近的文章，再汇总段落，避免扫描该词汇的全部出现记录
+        articles = conn.execute(
+            "SELECT a.id, a.title, a.difficulty, a.created_at, group_concat(o.paragraph) AS paragraphs "
+            "FROM (SELECT DISTINCT article_id FROM occurrences WHERE term_id = ? "
+            "      ORDER BY article_id DESC LIMIT ?) recent "
+            "JOIN occurrences o ON o.term_id = ? AND o.article_id = recent.article_id "
+            "JOIN articles a ON a.id = recent.article_id "
+            "GROUP BY a.id ORDER BY a.id DESC",
+            (row["id"], limit, row["id"]),
+        ).fetchall()
+        frequency = conn.execute(
+            "SELECT difficulty, freq, articles FROM term_freq WHERE term_id = ?", (row["id"],)
+        ).fetchall()
+
+        return {
+            "term": row["term"],
+            "found": True,
+            "type": row["type"],
+            "pos": row["pos"],
+            "definition": row["definition"],
+            "definition-ch": row["definition_ch"],
+            "frequency": {f["difficulty"]: {"freq": f["freq"], "articles": f["articles"]} for f in frequency},
+            "articles": [
+                {
+                    "id": a["id"],
+                    "title": a["title"],
+                    "difficulty": a["difficulty"],
+                    "created_at": a["created_at"],
+                    "paragraphs": sorted(int(p) for p in a["paragraphs"].split(",")),
+                }
+                for a in articles
+            ],
+        }
+
+    def top_terms(self, n: int = 50, difficulty: str = None, item_type: str = None) -> list:
+        """按频次获取语料中最常见的词汇（可按难度和类型筛选）"""
+        sql = (
+            "SELECT t.term, t.type, t.pos, t.definition, t.definition_ch, f.freq, f.articles "
+            "FROM term_freq f JOIN terms t ON t.id = f.term_id WHERE f.difficulty = ?"
+        )
+        params = [difficulty or ALL_DIFFICULTIES]
+        if item_type:
+            sql += " AND f.type = ?"
+            params.append(item_type)
+        sql += " ORDER BY f.freq DESC"
+        if n:
+            sql += " LIMIT ?"
+            params.append(n)
+
+        return [
+            {
+                "word": r["term"],
+                "pos": r["pos"],
+                "definition": r["definition"],
+                "definition-ch": r["definition_ch"],
+                "common-usage": [],
+                "type": r["type"],
+                "freq": r["freq"],
+                "articles": r["articles"],
+            }
+            for r in self._connect().execute(sql, params)
+        ]
+
+    def export_terms(self, difficulty: str = None) -> list:
+        """导出完整的聚合词汇表（与词汇列表结构一致，可直接用于Excel导出）"""
+        return self.top_terms(n=0, difficulty=difficulty)
+
+    def stats(self) -> dict:
+        """索引规模统计"""
+        conn = self._connect()
+        return {
+            "articles": conn.execute("SELECT count(*) FROM articles").fetchone()[0],
+            "terms": conn.execute("SELECT count(*) FROM terms").fetchone()[0],
+        }
+
+
+# 性能测试：python -m utils.corpus_index [文章数]
+if __name__ == "__main__":
+    import sys
+    import time
+    import random
+    import tempfile
+
+    COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    random.seed(0)
+    vocabulary = [f"term{i}" for i in range(50000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CorpusIndex(os.path.join(tmp, "corpus.db"))
+        started = time.perf_counter()
+        for i in range(COUNT):
+            words = random.sample(vocabulary, 30)
+            vocab = [{"word": w, "pos": ".n", "definition": "", "paragraph": j % 5 + 1} for j, w in enumerate(words)]
+            index.add_article(f"article {i}", random.choice(["basic", "medium", "advanced"]), vocab)
+        print(f"写入 {COUNT} 篇文章: {time.perf_counter() - started:.1f}s")
+
+        for name, query in [
+            ("which articles contain X", lambda: index.find_articles("term42")),
+            ("top-50 (all)", lambda: index.top_terms(50)),
+            ("top-50 (medium)", lambda: index.top_terms(50, "medium")),
+        ]:
+            started = time.perf_counter()
+            for _ in range(100):
+                query()
+            print(f"{name}: {(time.perf_counter() - started) * 10:.2f} ms/次")
@@ -22,13 +22,15 @@ if __name__ == "__main__":
 # 假设在其他模块中已经配置了logger
 logger = logging.getLogger(__name__)
 
-def export_vocab_to_excel(vocab_list, filename=None):
+def export_vocab_to_excel(vocab_list, filename=None, extra_columns=None):
     """
     将词汇列表导出为美观、舒适的Excel文件
     
     参数:
-        vocab_list: 词汇字典列表
+        vocab_list: 词汇字典列表或 VocabBatch
         filename: 自定义文件名（可选）
+        extra_columns: 额外导出的列（可选，如语料聚合表的 type/freq/articles），
+                       放在常见用法列之后
     
     返回:
         str: 生成的文件路径
@@ -40,8 +42,11 @@ def export_vocab_to_excel(vocab_list, filename=None):
         
         logger.info(f"开始导出词汇表到Excel，共 {len(vocab_list)} 个词汇项")
         
-        # 创建数据框架
-        df = pd.DataFrame(vocab_list)
+        # 创建数据框架（VocabBatch 直接按列构建，无需逐项转换为字典）
+        if hasattr(vocab_list, 'to_columns'):
+            df = pd.DataFrame(vocab_list.to_columns())
+        else:
+            df = pd.DataFrame(vocab_list)
         
         # 确保所有必需的列都存在
         required_columns = ['word', 'pos', 'definition', 'definition-ch', 'common-usage']
@@ -70,10 +75,15 @@ def export_vocab_to_excel(vocab_list, filename=None):
         os.makedirs("exports", exist_ok=True)
         filepath = os.path.join("exports", filename)
         
-        # 定义列顺序和标题
+        # 定义列顺序和标题（额外列缺失时创建空列）
+        extra_columns = list(extra_columns or [])
+        for col in extra_columns:
+            if col not in df.columns:
+                logger.warning(f"缺失列 '{col}'，创建空列")
+                df[col] = ""
         column_order = [
             'word', 'pos', 'definition', 'definition-ch', 
-            'common-usage', 'example', 'mastery', 'notes'
+            'common-usage', *extra_columns, 'example', 'mastery', 'notes'
         ]
         
         # 重新排序列
@@ -89,18 +99,19 @@ def export_vocab_to_excel(vocab_list, filename=None):
             
             # 设置列宽 - 优化美观性
             column_widths = {
-                'A': 22,  # Word - 足够容纳大多数单词
-                'B': 8,   # POS - 词性缩写
-                'C': 42,  # Definition (English) - 中等宽度
-                'D': 25,  # Definition (Chinese) - 中文通常更简洁
-                'E': 55,  # Common Usage - 以"|"分隔的用法
-                'F': 50,  # Example - 用户添加的例句
-                'G': 12,  # Mastery - 掌握程度标记
-                'H': 40   # Notes - 笔记
+                'word': 22,           # Word - 足够容纳大多数单词
+                'pos': 8,             # POS - 词性缩写
+                'definition': 42,     # Definition (English) - 中等宽度
+                'definition-ch': 25,  # Definition (Chinese) - 中文通常更简洁
+                'common-usage': 55,   # Common Usage - 以"|"分隔的用法
+                'example': 50,        # Example - 用户添加的例句
+                'mastery': 12,        # Mastery - 掌握程度标记
+                'notes': 40           # Notes - 笔记
             }
             
-            for col, width in column_widths.items():
-                worksheet.column_dimensions[col].width = width
+            # 额外列（频次等）使用较窄的默认宽度
+            for idx, col in enumerate(column_order, 1):
+                worksheet.column_dimensions[get_column_letter(idx)].width = column_widths.get(col, 12)
             
             # 设置标题行样式 - 专业而优雅
             header_fill = PatternFill(
@@ -161,7 +172,7 @@ def export_vocab_to_excel(vocab_list, filename=None):
             worksheet.freeze_panes = 'A2'
             
             # 添加筛选器
-            worksheet.auto_filter.ref = f"A1:H1"
+            worksheet.auto_filter.ref = f"A1:{get_column_letter(len(column_order))}1"
             
             # 添加文件元数据
             workbook.properties.title = "词汇表"
@@ -188,7 +199,7 @@ def export_to_csv(vocab_list, filename=None):
     将词汇列表导出为CSV文件（备选格式）
     
     参数:
-        vocab_list: 词汇字典列表
+        vocab_list: 词汇字典列表或 VocabBatch
         filename: 自定义文件名（可选）
     
     返回:
@@ -201,8 +212,11 @@ def export_to_csv(vocab_list, filename=None):
         
         logger.info(f"开始导出词汇表到CSV，共 {len(vocab_list)} 个词汇项")
         
-        # 创建数据框架
-        df = pd.DataFrame(vocab_list)
+        # 创建数据框架（VocabBatch 直接按列构建，无需逐项转换为字典）
+        if hasattr(vocab_list, 'to_columns'):
+            df = pd.DataFrame(vocab_list.to_columns())
+        else:
+            df = pd.DataFrame(vocab_list)
         
         # 确保常见用法列格式化为以"|"分隔的字符串
         if 'common-usage' in df.columns:
@@ -0,0 +1,68 @@
+import gzip
+import hashlib
+import logging
+
+# brotli 为可选依赖，未安装时只使用gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 假设在其他模块中已经配置了logger
+logger = logging.getLogger(__name__)
+
+# 需要压缩的响应类型（xlsx 等本身已压缩的文件不再处理）
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv", "text/plain", "text/html"}
+
+# 小于该字节数的响应不压缩
+MIN_COMPRESS_SIZE = 500
+
+
+def content_etag(*parts) -> str:
+    """根据内容（文章、难度、模型等）生成ETag值"""
+    digest = hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return digest[:32]
+
+
+def supported_encodings() -> list:
+    """服务端支持的压缩编码（按优先级）"""
+    return ["br", "gzip"] if brotli else ["gzip"]
+
+
+def compress_response(response, accept_encodings):
+    """
+    按客户端 Accept-Encoding 压缩响应体（br 优先，其次 gzip）
+
+    参数:
+        response: Flask 响应对象
+        accept_encodings: request.accept_encodings
+    """
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code >= 300
+        or response.status_code == 204
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    encoding = accept_encodings.best_match(supported_encodings())
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=5)
+    else:
+        compressed = gzip.compress(data, compresslevel=6)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    logger.debug("响应已压缩 (%s): %d -> %d 字节", encoding, len(data), len(compressed))
+    return response
@@ -0,0 +1,257 @@
+import time
+import logging
+import threading
+from collections import deque
+
+# 假设在其他模块中已经配置了logger
+logger = logging.getLogger(__name__)
+
+# 优先级通道
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+
+class QuotaExceeded(Exception):
+    """用户/IP 超出配额"""
+
+
+class SchedulerTimeout(Exception):
+    """排队等待上游请求槽位超时"""
+
+
+class SchedulerCancelled(Exception):
+    """排队中的请求已被取消（如对冲竞争已有胜出者）"""
+
+
+class _Ticket:
+    __slots__ = ("lane", "cancelled", "granted")
+
+    def __init__(self, lane: str, cancelled: threading.Event = None):
+        self.lane = lane
+        self.cancelled = cancelled
+        self.granted = False
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled is not None and self.cancelled.is_set()
+
+
+def parse_weights(spec: str) -> dict:
+    """解析通道权重配置，如 "interactive:4,batch:1" """
+    weights = {}
+    for part in spec.split(","):
+        if ":" in part:
+            lane, weight = part.split(":", 1)
+            weights[lane.strip()] = max(float(weight), 0.01)
+    return weights or {INTERACTIVE: 4.0, BATCH: 1.0}
+
+
+class LLMScheduler:
+    """
+    进程级LLM请求调度器
+    - 并发槽位 + 每分钟请求数令牌桶，共同约束对上游的访问
+    - 优先级通道之间按权重公平分配（stride调度），交互请求优先但批量请求不会饿死
+    - 为交互通道预留槽位：其他通道最多同时占用 max_concurrent - interactive_reserve 个槽位，
+      交互流量空闲时批量任务也不会占满全部槽位，随后到达的交互请求无需等待整次上游调用
+    - 按IP限制同时进行的提取数和每分钟提取数：配额在提取开始时（admit）一次性扣除，
+      不按段落或对冲请求计数，因此不会在文章处理到一半时被拒绝
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        rate_per_minute: float = 0,
+        weights: dict = None,
+        client_max_pending: int = 20,
+        client_rate_per_minute: int = 0,
+        interactive_reserve: int = 1,
+    ):
+        self.max_concurrent = max(max_concurrent, 1)
+        # 至少保留一个非交互槽位，避免批量任务被永久阻塞
+        self.background_limit = max(self.max_concurrent - max(interactive_reserve, 0), 1)
+        self.rate_per_minute = rate_per_minute
+        self.weights = weights or {INTERACTIVE: 4.0, BATCH: 1.0}
+        self.client_max_pending = client_max_pending
+        self.client_rate_per_minute = client_rate_per_minute
+
+        self._cond = threading.Condition()
+        self._queues = {lane: deque() for lane in self.weights}
+        self._pass = {lane: 0.0 for lane in self.weights}
+        self._virtual_time = 0.0
+        self._in_flight = 0
+        self._background_in_flight = 0
+        self._tokens = float(rate_per_minute) if rate_per_minute else 0.0
+        self._refilled = time.monotonic()
+        self._client_active = {}
+        self._client_history = {}
+        self._swept = time.monotonic()
+        self._dispatched = {lane: 0 for lane in self.weights}
+        self._rejected = 0
+
+    # ---------- 配额 ----------
+    def admit(self, client_id: str = None):
+        """
+        开始一次提取前检查并扣除配额（每篇文章一次，与段落数和对冲请求无关）
+        成功后必须调用 finish() 结束
+
+        异常:
+            QuotaExceeded: 同时进行的提取过多或每分钟提取次数超限
+        """
+        client_id = client_id or "anonymous"
+        with self._cond:
+            now = time.monotonic()
+            if now - self._swept > 60:
+                self._sweep(now)
+
+            active = self._client_active.get(client_id, 0)
+            if self.client_max_pending and active >= self.client_max_pending:
+                self._rejected += 1
+                raise QuotaExceeded(f"同时进行的提取过多（上限 {self.client_max_pending}）")
+
+            if self.client_rate_per_minute:
+                history = self._client_history.get(client_id)
+                if history is None:
+                    history = self._client_history[client_id] = deque()
+                while history and now - history[0] > 60:
+                    history.popleft()
+                if len(history) >= self.client_rate_per_minute:
+                    self._rejected += 1
+                    raise QuotaExceeded(f"请求过于频繁（每分钟上限 {self.client_rate_per_minute} 次）")
+                history.append(now)
+
+            self._client_active[client_id] = active + 1
+
+    def finish(self, client_id: str = None):
+        """结束一次提取（与 admit() 成对调用）"""
+        client_id = client_id or "anonymous"
+        with self._cond:
+            active = self._client_active.get(client_id, 0) - 1
+            if active > 0:
+                self._client_active[client_id] = active
+            else:
+                self._client_active.pop(client_id, None)
+
+    def _sweep(self, now: float):
+        """清理一分钟内没有请求的IP，避免历史记录无限增长"""
+        stale = [cid for cid, history in self._client_history.items() if not history or now - history[-1] > 60]
+        for cid in stale:
+            del self._client_history[cid]
+        self._swept = now
+
+    # ---------- 调度 ----------
+    def _refill(self, now: float):
+        if not self.rate_per_minute:
+            return
+        self._tokens = min(
+            float(self.rate_per_minute),
+            self._tokens + (now - self._refilled) * self.rate_per_minute / 60,
+        )
+        self._refilled = now
+
+    def _dispatch(self, now: float) -> float:
+        """
+        在有空闲槽位和令牌时按权重公平地放行排队请求
+        返回下一个令牌到达前需要等待的秒数（无需等待令牌时返回None）
+        """
+        self._refill(now)
+        while self._in_flight < self.max_concurrent:
+            # 已取消的请求直接出队，不占用槽位、令牌和通道额度（等待线程醒来后自行退出）
+            for q in self._queues.values():
+                while q and q[0].is_cancelled():
+                    q.popleft()
+            # 非交互通道达到上限时暂不放行，剩余槽位留给交互请求
+            lanes = [
+                lane for lane, q in self._queues.items()
+                if q and (lane == INTERACTIVE or self._background_in_flight < self.background_limit)
+            ]
+            if not lanes:
+                return None
+            if self.rate_per_minute and self._tokens < 1:
+                return (1 - self._tokens) * 60 / self.rate_per_minute
+
+            # 选择虚拟进度最小的通道，放行后按 1/权重 推进
+            lane = min(lanes, key=lambda name: self._pass[name])
+            ticket = self._queues[lane].popleft()
+            self._virtual_time = self._pass[lane]
+            self._pass[lane] += 1.0 / self.weights[lane]
+
+            ticket.granted = True
+            self._in_flight += 1
+            if lane != INTERACTIVE:
+                self._background_in_flight += 1
+            self._dispatched[lane] += 1
+            if self.rate_per_minute:
+                self._tokens -= 1
+            # 被放行的可能是其他线程的请求，需要唤醒等待者
+            self._cond.notify_all()
+        return None
+
+    def acquire(self, lane: str = INTERACTIVE, timeout: float = None, cancelled: threading.Event = None):
+        """
+        获取一个上游请求槽位（阻塞直到放行），返回实际使用的通道（释放时传给 release()）
+
+        参数:
+            cancelled: 取消事件（可选），通过 cancel() 设置后排队中的请求立即退出
+
+        异常:
+            SchedulerTimeout: 排队超过 timeout 秒
+            SchedulerCancelled: 排队期间 cancelled 被设置
+        """
+        if lane not in self._queues:
+            lane = INTERACTIVE if INTERACTIVE in self._queues else next(iter(self._queues))
+        deadline = time.monotonic() + timeout if timeout else None
+
+        with self._cond:
+            # 空闲通道重新排队时，从当前虚拟时间开始，避免积累过多额度
+            if not self._queues[lane]:
+                self._pass[lane] = max(self._pass[lane], self._virtual_time)
+
+            ticket = _Ticket(lane, cancelled)
+            self._queues[lane].append(ticket)
+
+            while True:
+                wait = self._dispatch(time.monotonic())
+                if ticket.granted:
+                    return lane
+                if ticket.is_cancelled():
+                    # 可能已被 _dispatch 出队
+                    if ticket in self._queues[lane]:
+                        self._queues[lane].remove(ticket)
+                    raise SchedulerCancelled("请求已取消")
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._queues[lane].remove(ticket)
+                        raise SchedulerTimeout(f"排队等待超过 {timeout}s")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def cancel(self, cancelled: threading.Event):
+        """设置取消事件并唤醒排队者，使用该事件排队的请求不再等待槽位"""
+        with self._cond:
+            cancelled.set()
+            self._cond.notify_all()
+
+    def release(self, lane: str):
+        """释放槽位并唤醒排队的请求（lane 为 acquire() 的返回值）"""
+        with self._cond:
+            self._in_flight -= 1
+            if lane != INTERACTIVE:
+                self._background_in_flight -= 1
+            self._dispatch(time.monotonic())
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        """调度器状态统计"""
+        with self._cond:
+            return {
+                "in_flight": self._in_flight,
+                "background_in_flight": self._background_in_flight,
+                "max_concurrent": self.max_concurrent,
+                "background_limit": self.background_limit,
+                "queued": {lane: len(q) for lane, q in self._queues.items()},
+                "dispatched": dict(self._dispatched),
+                "rejected": self._rejected,
+                "active_clients": len(self._client_active),
+                "tracked_clients": len(self._client_history),
+                "weights": dict(self.weights),
+            }
@@ -0,0 +1,249 @@
+import os
+import re
+import json
+import math
+import logging
+from collections import Counter
+from functools import lru_cache
+from utils.pos import normalize_pos
+from utils.vocab_items import VocabItem
+
+# 假设在其他模块中已经配置了logger
+logger = logging.getLogger(__name__)
+
+# 高频核心词（频段0）：功能词与最常见的实义词，离线模式下永不提取
+CORE_WORDS = frozenset("""
+a about above across after again against all almost also although always am among an and another any anyone
+anything are around as at away back be became because become been before being below between both but by
+came can cannot could day did do does doing done down during each early either else end enough even ever
+every few first for from get gets getting give given go goes going gone good got great had has have having
+he her here hers herself him himself his how however i if in into is it its itself just know last least
+less let like little long made make makes making man many may me might more most much must my myself
+near need never new next no none nor not nothing now of off often old on once one only or other others
+our ours ourselves out over own part people per place put rather really right said same say says see seem
+seemed seems several shall she should show since so some someone something sometimes still such take
+than that the their theirs them themselves then there these they thing things think this those though
+through thus time to today together too took toward towards two under until up upon us use used using
+very want was way we well went were what whatever when where whether which while who whole whom whose
+why will with within without work would year years yet you your yours yourself yourselves
+""".split())
+
+# 学术词缀：带有这些词缀的词归入最高频段
+ACADEMIC_SUFFIXES = (
+    "tion", "sion", "ment", "ness", "ity", "ism", "ance", "ence", "ship",
+    "ous", "ive", "ical", "ible", "able", "ize", "ise", "ify", "ology",
+)
+
+# 词缀到词性的映射（按顺序匹配）
+# -ate/-ates 不作判断（climate、private 等大量名词/形容词），交给词库；-ed 在 guess_pos 中按词长处理
+SUFFIX_POS = (
+    ("ly", ".adv"),
+    ("izes", ".v"), ("ises", ".v"), ("ifies", ".v"),
+    ("tion", ".n"), ("sion", ".n"), ("ment", ".n"), ("ness", ".n"), ("ity", ".n"),
+    ("ism", ".n"), ("ance", ".n"), ("ence", ".n"), ("ship", ".n"), ("ology", ".n"),
+    ("ous", ".adj"), ("ful", ".adj"), ("ive", ".adj"), ("able", ".adj"), ("ible", ".adj"),
+    ("ical", ".adj"), ("less", ".adj"), ("ic", ".adj"), ("al", ".adj"),
+    ("ize", ".v"), ("ise", ".v"), ("ify", ".v"), ("ing", ".v"),
+)
+
+# 各难度允许的频段
+DIFFICULTY_BANDS = {
+    "basic": (1, 2),
+    "medium": (2, 3),
+    "advanced": (3,),
+}
+
+# 三元组搭配允许的中间功能词（如 rule of law, trial and error）
+LINK_WORDS = frozenset(["of", "in", "on", "for", "to", "with", "and", "by", "into"])
+
+# 每段最多提取的单词和词组数量（保持 单词:词组 ≈ 2:1）
+MAX_WORDS = 12
+MAX_PHRASES = 6
+
+# 词组至少出现的次数（只出现一次的n-gram无法区分搭配与偶然相邻，词库中的词组除外）
+MIN_PHRASE_COUNT = 2
+
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:[-'][A-Za-z]+)*")
+
+
+@lru_cache(maxsize=4)
+def load_lexicon(path: str) -> dict:
+    """
+    加载本地词库（JSON格式：{"word": {"pos": ..., "definition": ..., "definition-ch": ...}}）
+    文件不存在时返回空词库
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        lexicon = {str(k).lower(): v for k, v in data.items() if isinstance(v, dict)}
+        logger.info("已加载本地词库 %s，共 %d 个词条", path, len(lexicon))
+        return lexicon
+    except Exception as e:
+        logger.error("加载本地词库失败: %s", e)
+        return {}
+
+
+def frequency_band(word: str, lexicon: dict = None) -> int:
+    """
+    估算词汇频段（0最常见，3最少见）
+    优先使用词库中的 band 字段，否则按核心词表、词长和学术词缀估算
+    """
+    entry = (lexicon or {}).get(word)
+    if entry and isinstance(entry.get("band"), int):
+        return entry["band"]
+    if word in CORE_WORDS or len(word) <= 3:
+        return 0
+    if len(word) <= 5:
+        return 1
+    if len(word) >= 9 or word.endswith(ACADEMIC_SUFFIXES):
+        return 3
+    return 2
+
+
+def guess_pos(word: str) -> str:
+    """根据词缀猜测词性，无法判断时默认为名词"""
+    for suffix, pos in SUFFIX_POS:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return pos
+    # -ed：长词多为形容词性的分词（unprecedented），短词多为动词过去式（changed）
+    if len(word) > 4 and word.endswith("ed"):
+        return ".adj" if len(word) > 8 else ".v"
+    return ".n"
+
+
+def _make_item(text: str, pos: str, item_type: str, lexicon: dict) -> VocabItem:
+    """构造与LLM结果相同结构的词汇项，释义从本地词库中补充"""
+    entry = lexicon.get(text, {})
+
+    # 与LLM结果的校验保持一致：词库中的词性需规范化，单个例句字符串包装为列表
+    common_usage = entry.get("common-usage", [])
+    if not isinstance(common_usage, list):
+        common_usage = [common_usage] if isinstance(common_usage, str) else []
+
+    return VocabItem(
+        word=text,
+        pos=normalize_pos(entry.get("pos")) if entry.get("pos") else pos,
+        definition=entry.get("definition", ""),
+        definition_ch=entry.get("definition-ch", ""),
+        common_usage=common_usage,
+        type=item_type,
+        degraded=True,
+    )
+
+
+def _score_collocations(sentences: list, word_counts: Counter, total: int, lexicon: dict, bands: tuple) -> list:
+    """
+    基于n-gram搭配评分提取候选词组
+    二元组：两个非核心词相邻；三元组：实义词 + 功能词 + 实义词（如 rule of law）
+    评分采用出现次数加权的点互信息（PMI），词组的频段取其中最少见的实义词，需属于当前难度；
+    与得分更高的词组共用实义词的候选（重叠或被包含）不再重复提取
+    """
+    ngram_counts = Counter()
+    first_seen = {}
+    for tokens in sentences:
+        for i in range(len(tokens) - 1):
+            a, b = tokens[i], tokens[i + 1]
+            if a not in CORE_WORDS and b not in CORE_WORDS:
+                ngram = (a, b)
+                ngram_counts[ngram] += 1
+                first_seen.setdefault(ngram, len(first_seen))
+            if i + 2 < len(tokens):
+                c = tokens[i + 2]
+                if a not in CORE_WORDS and b in LINK_WORDS and c not in CORE_WORDS:
+                    ngram = (a, b, c)
+                    ngram_counts[ngram] += 1
+                    first_seen.setdefault(ngram, len(first_seen))
+
+    scored = []
+    for ngram, count in ngram_counts.items():
+        in_lexicon = " ".join(ngram) in lexicon
+        if count < MIN_PHRASE_COUNT and not in_lexicon:
+            continue
+        content = [w for w in ngram if w not in CORE_WORDS]
+        if max(frequency_band(w, lexicon) for w in content) not in bands:
+            continue
+        expected = 1.0
+        for w in content:
+            expected *= word_counts[w] / total
+        pmi = math.log2(count / (total * expected)) if expected > 0 else 0.0
+        score = count * (1.0 + pmi)
+        if in_lexicon:
+            score += 10.0
+        scored.append((-score, first_seen[ngram], ngram))
+
+    scored.sort()
+    phrases, used = [], set()
+    for _, _, ngram in scored:
+        content = {w for w in ngram if w not in CORE_WORDS}
+        if content & used:
+            continue
+        phrases.append(ngram)
+        used |= content
+    return phrases
+
+
+def extract_offline(article: str, difficulty: str = "medium", lexicon_path: str = None) -> list:
+    """
+    离线降级提取：不依赖LLM，基于频段和n-gram搭配评分确定性地提取单词和词组
+    返回结构与LLM结果一致（VocabItem），每个词汇项带有 degraded=True 标记
+
+    参数:
+        article: 英文文本（单个段落）
+        difficulty: 难度（basic/medium/advanced）
+        lexicon_path: 本地词库路径（可选），用于补充释义
+
+    返回:
+        list: VocabItem 列表
+    """
+    lexicon = load_lexicon(lexicon_path) if lexicon_path else {}
+    bands = DIFFICULTY_BANDS.get(difficulty, DIFFICULTY_BANDS["medium"])
+
+    raw_sentences = [WORD_PATTERN.findall(sentence) for sentence in re.split(r"(?<=[.!?;:])\s+", article)]
+
+    # 句中（非句首）大写开头、且从未以小写形式出现的词视为专有名词（人名、地名、机构等），不提取；
+    # 句子在专有名词处断开，避免形成跨越专有名词的词组
+    proper = {w.lower() for tokens in raw_sentences for w in tokens[1:] if w[0].isupper()}
+    proper -= {w for tokens in raw_sentences for w in tokens if w.islower()}
+
+    sentences = []
+    for tokens in raw_sentences:
+        run = []
+        for w in tokens:
+            w = w.lower()
+            if w in proper:
+                if run:
+                    sentences.append(run)
+                run = []
+            else:
+                run.append(w)
+        if run:
+            sentences.append(run)
+    word_counts = Counter(w for tokens in sentences for w in tokens)
+    total = sum(word_counts.values())
+    if not total:
+        return []
+
+    # 单词：按频段（高者优先）、出现次数、首次出现位置排序
+    first_pos = {}
+    for tokens in sentences:
+        for w in tokens:
+            first_pos.setdefault(w, len(first_pos))
+    candidates = [
+        (-frequency_band(w, lexicon), -count, first_pos[w], w)
+        for w, count in word_counts.items()
+        if frequency_band(w, lexicon) in bands and "'" not in w
+    ]
+    candidates.sort()
+    words = [w for _, _, _, w in candidates[:MAX_WORDS]]
+
+    phrases = _score_collocations(sentences, word_counts, total, lexicon, bands)[:MAX_PHRASES]
+
+    vocab = [_make_item(w, guess_pos(w), "word", lexicon) for w in words]
+    for ngram in phrases:
+        pos = ".v" if guess_pos(ngram[0]) == ".v" else ".n"
+        vocab.append(_make_item(" ".join(ngram), pos, "phrase", lexicon))
+
+    logger.info("离线提取完成：%d 个单词，%d 个词组", len(words), len(phrases))
+    return vocab
@@ -0,0 +1,72 @@
+# 词性映射表
+POS_MAPPING = {
+    # 名词
+    "n": ".n",
+    "noun": ".n",
+    "substantive": ".n",
+    ".n": ".n",
+    # 动词
+    "v": ".v",
+    "verb": ".v",
+    "vb": ".v",
+    ".v": ".v",
+    # 形容词
+    "adj": ".adj",
+    "adjective": ".adj",
+    "a": ".adj",
+    ".adj": ".adj",
+    # 副词
+    "adv": ".adv",
+    "adverb": ".adv",
+    "ad": ".adv",
+    ".adv": ".adv",
+    # 介词
+    "prep": ".prep",
+    "preposition": ".prep",
+    "pr": ".prep",
+    ".prep": ".prep",
+    # 连词
+    "conj": ".conj",
+    "conjunction": ".conj",
+    "cj": ".conj",
+    ".conj": ".conj",
+    # 代词
+    "pron": ".pron",
+    "pronoun": ".pron",
+    "pn": ".pron",
+    ".pron": ".pron",
+    # 限定词
+    "det": ".det",
+    "determiner": ".det",
+    "dt": ".det",
+    ".det": ".det",
+    # 数词
+    "num": ".num",
+    "numeral": ".num",
+    "number": ".num",
+    ".num": ".num",
+    # 感叹词
+    "intj": ".intj",
+    "interjection": ".intj",
+    "interj": ".intj",
+    ".intj": ".intj",
+    # 默认名词
+    "": ".n",
+    None: ".n",
+}
+
+
+def normalize_pos(pos: str) -> str:
+    """规范化词性标签"""
+    if not pos:
+        return ".n"
+
+    # 清理和标准化输入
+    pos = pos.lower().strip().replace(" ", "")
+
+    # 检查是否已经是标准格式
+    if pos in POS_MAPPING.values():
+        return pos
+
+    # 映射到标准格式
+    return POS_MAPPING.get(pos, ".n")
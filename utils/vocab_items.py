@@ -0,0 +1,227 @@
+import sys
+from array import array
+
+
+class VocabItem:
+    """
+    紧凑的词汇项：使用 __slots__ 避免每项一个 dict，pos/type 字符串被驻留共享
+    通过 to_dict()/from_dict() 与原有JSON结构（word/pos/definition/definition-ch/...）互转
+    """
+
+    __slots__ = ("word", "pos", "definition", "definition_ch", "common_usage", "type", "paragraph", "degraded")
+
+    def __init__(
+        self,
+        word: str,
+        pos: str = ".n",
+        definition: str = "",
+        definition_ch: str = "",
+        common_usage=(),
+        type: str = "word",
+        paragraph: int = None,
+        degraded: bool = False,
+    ):
+        self.word = word
+        self.pos = sys.intern(pos)
+        self.definition = definition
+        self.definition_ch = definition_ch
+        # 单个例句字符串视为一项（tuple(str) 会把字符串拆成单个字符）
+        self.common_usage = (common_usage,) if isinstance(common_usage, str) else tuple(common_usage)
+        self.type = sys.intern(type)
+        self.paragraph = paragraph
+        self.degraded = degraded
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VocabItem":
+        """从JSON结构的字典创建词汇项"""
+        return cls(
+            word=data["word"],
+            pos=data.get("pos", ".n"),
+            definition=data.get("definition", ""),
+            definition_ch=data.get("definition-ch", ""),
+            common_usage=data.get("common-usage", ()),
+            type=data.get("type", "word"),
+            paragraph=data.get("paragraph"),
+            degraded=bool(data.get("degraded", False)),
+        )
+
+    def to_dict(self) -> dict:
+        """转换为原有的JSON结构"""
+        data = {
+            "word": self.word,
+            "pos": self.pos,
+            "definition": self.definition,
+            "definition-ch": self.definition_ch,
+            "common-usage": list(self.common_usage),
+            "type": self.type,
+        }
+        if self.degraded:
+            data["degraded"] = True
+        if self.paragraph is not None:
+            data["paragraph"] = self.paragraph
+        return data
+
+    def __repr__(self) -> str:
+        return f"VocabItem({self.word!r}, pos={self.pos!r}, type={self.type!r}, paragraph={self.paragraph!r})"
+
+
+class VocabBatch:
+    """
+    列式存储的词汇批次，适合语料级的大量词汇项
+    pos/type 以一字节编码存放在 array 中，段落号和降级标记同样使用紧凑数组
+    """
+
+    # 未设置段落号时的占位值
+    NO_PARAGRAPH = -1
+
+    def __init__(self, items=()):
+        self.words = []
+        self.definitions = []
+        self.definitions_ch = []
+        self.common_usages = []
+        self.pos_codes = array("B")
+        self.type_codes = array("B")
+        self.paragraphs = array("i")
+        self.degraded = bytearray()
+        # 降级或失败（没有完整LLM结果）的段落数，由分段提取时记录
+        self.incomplete_segments = 0
+        self._labels = []
+        self._codes = {}
+        for item in items:
+            self.append(item)
+
+    def _code(self, label: str) -> int:
+        """获取 pos/type 标签的编码（首次出现时登记）"""
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._labels.append(sys.intern(label))
+            self._codes[label] = code
+        return code
+
+    def append(self, item: VocabItem, paragraph: int = None):
+        """追加词汇项，paragraph 不为空时覆盖词汇项自带的段落号"""
+        if paragraph is None:
+            paragraph = item.paragraph
+        self.words.append(item.word)
+        self.definitions.append(item.definition)
+        self.definitions_ch.append(item.definition_ch)
+        self.common_usages.append(item.common_usage)
+        self.pos_codes.append(self._code(item.pos))
+        self.type_codes.append(self._code(item.type))
+        self.paragraphs.append(self.NO_PARAGRAPH if paragraph is None else paragraph)
+        self.degraded.append(1 if item.degraded else 0)
+
+    def extend(self, items, paragraph: int = None):
+        for item in items:
+            self.append(item, paragraph)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def complete(self) -> bool:
+        """是否所有段落都得到了完整的LLM结果"""
+        return self.incomplete_segments == 0
+
+    def __getitem__(self, index: int) -> VocabItem:
+        paragraph = self.paragraphs[index]
+        return VocabItem(
+            word=self.words[index],
+            pos=self._labels[self.pos_codes[index]],
+            definition=self.definitions[index],
+            definition_ch=self.definitions_ch[index],
+            common_usage=self.common_usages[index],
+            type=self._labels[self.type_codes[index]],
+            paragraph=None if paragraph == self.NO_PARAGRAPH else paragraph,
+            degraded=bool(self.degraded[index]),
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_dicts(self) -> list:
+        """转换为原有的JSON结构列表（用于接口响应和保存文件），直接从各列构建，不创建中间词汇项"""
+        labels = self._labels
+        dicts = []
+        for word, pos_code, definition, definition_ch, usage, type_code, paragraph, degraded in zip(
+            self.words,
+            self.pos_codes,
+            self.definitions,
+            self.definitions_ch,
+            self.common_usages,
+            self.type_codes,
+            self.paragraphs,
+            self.degraded,
+        ):
+            data = {
+                "word": word,
+                "pos": labels[pos_code],
+                "definition": definition,
+                "definition-ch": definition_ch,
+                "common-usage": list(usage),
+                "type": labels[type_code],
+            }
+            # 与 VocabItem.to_dict() 的字段顺序保持一致
+            if degraded:
+                data["degraded"] = True
+            if paragraph != self.NO_PARAGRAPH:
+                data["paragraph"] = paragraph
+            dicts.append(data)
+        return dicts
+
+    def to_columns(self) -> dict:
+        """转换为列字典，可直接用于 pd.DataFrame（用于Excel/CSV导出）"""
+        labels = self._labels
+        return {
+            "word": self.words,
+            "pos": [labels[code] for code in self.pos_codes],
+            "definition": self.definitions,
+            "definition-ch": self.definitions_ch,
+            "common-usage": [list(usage) for usage in self.common_usages],
+            "type": [labels[code] for code in self.type_codes],
+            "paragraph": [None if p == self.NO_PARAGRAPH else p for p in self.paragraphs],
+            "degraded": [bool(flag) for flag in self.degraded],
+        }
+
+
+# 内存占用对比测试：python -m utils.vocab_items [数量]
+if __name__ == "__main__":
+    import json
+    import tracemalloc
+
+    COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    POS_VALUES = [".n", ".v", ".adj", ".adv"]
+
+    def synthetic(i: int) -> dict:
+        # 模拟 json.loads 的结果：每项的 pos/type 都是独立的字符串对象
+        return json.loads(json.dumps({
+            "word": f"word{i}",
+            "pos": POS_VALUES[i % 4],
+            "definition": f"definition of word {i}",
+            "definition-ch": "",
+            "common-usage": [f"usage {i}"],
+            "type": "phrase" if i % 3 == 0 else "word",
+            "paragraph": i % 50,
+        }))
+
+    def measure(build):
+        tracemalloc.start()
+        data = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return data, size
+
+    dicts, dict_size = measure(lambda: [synthetic(i) for i in range(COUNT)])
+    del dicts
+    items, item_size = measure(lambda: [VocabItem.from_dict(synthetic(i)) for i in range(COUNT)])
+    _, batch_size = measure(lambda: VocabBatch(items))
+    del items
+    _, batch_total = measure(lambda: VocabBatch(VocabItem.from_dict(synthetic(i)) for i in range(COUNT)))
+
+    print(f"{COUNT} 个词汇项的内存占用（每项字节数）：")
+    print(f"  dict 列表:           {dict_size / COUNT:8.1f}")
+    print(f"  VocabItem 列表:      {item_size / COUNT:8.1f}")
+    print(f"  VocabBatch（含字符串）: {batch_total / COUNT:8.1f}")
+    print(f"  VocabBatch（仅容器）:  {batch_size / COUNT:8.1f}")